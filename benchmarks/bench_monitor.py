@@ -0,0 +1,335 @@
+# bench_monitor.py
+# Benchmarks for the per-tick monitoring path, runnable on Linux against fake
+# audio-session and Spotify backends. Results are written as JSON so runs can
+# be compared against a saved baseline.
+#
+#   python benchmarks/bench_monitor.py --output bench.json
+#   python benchmarks/bench_monitor.py --baseline bench.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# pystray picks a GUI backend on import; the dummy one needs no display, so
+# the menu benchmarks run anywhere
+os.environ.setdefault("PYSTRAY_BACKEND", "dummy")
+
+import main  # noqa: E402
+
+# ==========================================================
+# FAKES
+# ==========================================================
+
+PROCESS_NAMES = ["chrome", "teams", "discord", "game", "explorer"]
+
+
+def make_audio_backend(session_count, seed=0, silent=False):
+    # main.FakeAudioBackend has one session per process name, so repeated
+    # apps get numbered names
+    rng = random.Random(seed)
+    peaks = {}
+    for i in range(session_count):
+        name = "spotify.exe" if i == 0 else f"{rng.choice(PROCESS_NAMES)}-{i}.exe"
+        peaks[name] = 0.0 if silent else rng.random() * 0.01
+    return main.FakeAudioBackend(peaks)
+
+
+class FakeAuthManager:
+    def get_access_token(self, as_dict=True):
+        return "token"
+
+
+class FakeSpotify:
+    # Stands in for spotipy.Spotify; every call costs one simulated round trip
+
+    def __init__(self, latency=0.0, device_name="Benchmark PC"):
+        self.latency = latency
+        self.device_name = device_name
+        self.auth_manager = FakeAuthManager()
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def devices(self):
+        self._round_trip()
+        return {"devices": [{"name": self.device_name, "id": "device-1"}]}
+
+    def current_playback(self):
+        self._round_trip()
+        return {"is_playing": False}
+
+    def start_playback(self, device_id=None, **kwargs):
+        self._round_trip()
+
+    def volume(self, volume_percent, device_id=None):
+        self._round_trip()
+
+    def current_user(self):
+        self._round_trip()
+        return {"display_name": "Benchmark"}
+
+
+# ==========================================================
+# HARNESS
+# ==========================================================
+
+
+def measure(func, iterations, warmup=None, setup=None):
+    # setup, if given, runs untimed before every call
+    for _ in range(warmup if warmup is not None else min(iterations, 10)):
+        if setup:
+            setup()
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "median_us": statistics.median(samples) * 1e6,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6,
+        "min_us": samples[0] * 1e6,
+    }
+
+
+def reset_spotify(latency):
+    main.sp = FakeSpotify(latency)
+    main.SPOTIFY_DEVICE_NAME = main.sp.device_name
+    main.CHANGE_SYSTEM_VOLUME = False
+    main.device_cache = main.DeviceCache()
+    main.resume_prefetcher = main.ResumePrefetcher()
+    main.circuit_breaker = main.CircuitBreaker()
+    main.spotify_connector.state = main.SpotifyConnector.READY
+    # The real per-endpoint budget would throttle a tight benchmark loop
+    main.spotify_calls = main.SpotifyCallLayer(rate=1e9, burst=1e9)
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+
+
+def bench_get_audio_state(quick):
+    results = []
+    for count in (1, 10, 50, 100, 500):
+        for silent in (False, True):
+            backend = make_audio_backend(count, silent=silent)
+            main.session_registry = main.AudioSessionRegistry(backend)
+            main.session_registry.start()
+            results.append(
+                (
+                    "get_audio_state",
+                    {"sessions": count, "silent": silent},
+                    measure(main.get_audio_state, 200 if quick else 2000),
+                )
+            )
+        results.append(
+            (
+                "session_registry_resync",
+                {"sessions": count},
+                measure(main.session_registry.sync, 20 if quick else 200),
+            )
+        )
+    return results
+
+
+def bench_monitor_tick(quick):
+    results = []
+    reset_spotify(0.0)
+    main.tray_icon = None
+    for count in (1, 50, 500):
+        main.session_registry = main.AudioSessionRegistry(make_audio_backend(count))
+        main.session_registry.start()
+        main.monitor_state = main.MonitorState(time.monotonic())
+        results.append(
+            (
+                "monitor_tick",
+                {"sessions": count},
+                measure(main.monitor_tick, 200 if quick else 2000),
+            )
+        )
+    return results
+
+
+def walk_menu(menu):
+    # Evaluate everything pystray reads when it builds the native menu
+    for menu_item in menu.items:
+        if menu_item is main.pystray.Menu.SEPARATOR:
+            continue
+        menu_item.text
+        menu_item.checked
+        menu_item.enabled
+        if menu_item.submenu:
+            walk_menu(menu_item.submenu)
+
+
+def bench_menu(quick):
+    reset_spotify(0.0)
+    main.device_cache.seed(main.sp.devices()["devices"])
+    menu = main.create_menu()
+    return [
+        ("create_menu", {}, measure(main.create_menu, 50 if quick else 500)),
+        ("menu_render", {}, measure(lambda: walk_menu(menu), 50 if quick else 500)),
+    ]
+
+
+def bench_resume(quick):
+    results = []
+    for latency_ms in (0, 20, 100):
+        latency = latency_ms / 1000
+        iterations = 3 if latency_ms >= 100 or quick else 20
+
+        def cold_setup():
+            reset_spotify(latency)
+
+        def prefetched_setup():
+            # The prefetch runs during the countdown, so it isn't timed
+            reset_spotify(latency)
+            main.resume_prefetcher._run()
+
+        results.append(
+            (
+                "resume_spotify_cold",
+                {"latency_ms": latency_ms},
+                measure(main.resume_spotify, iterations, 1, cold_setup),
+            )
+        )
+        results.append(
+            (
+                "resume_spotify_prefetched",
+                {"latency_ms": latency_ms},
+                measure(main.resume_spotify, iterations, 1, prefetched_setup),
+            )
+        )
+    return results
+
+
+def make_audio_rules(count):
+    # A mix of plain names, wildcard names, paths and display names
+    rules = []
+    for i in range(count):
+        field = ("exe", "exe", "path", "name")[i % 4]
+        pattern = f"app-{i}.exe" if i % 8 else f"app-{i}-*.exe"
+        if field == "path":
+            pattern = rf"C:\Program Files\App {i}\*"
+        elif field == "name":
+            pattern = f"App {i}"
+        rules.append({field: pattern, "action": "ignore"})
+    return rules
+
+
+def bench_audio_rules(quick):
+    results = []
+    for count in (0, 10, 100, 1000):
+        rules = main.AudioRules(make_audio_rules(count))
+        results.append(
+            (
+                "audio_rules_classify",
+                {"rules": count},
+                measure(
+                    lambda: rules.classify(
+                        "unmatched.exe", r"C:\Program Files\Other\unmatched.exe", "X"
+                    ),
+                    200 if quick else 2000,
+                ),
+            )
+        )
+    return results
+
+
+BENCHMARKS = {
+    "audio": bench_get_audio_state,
+    "tick": bench_monitor_tick,
+    "menu": bench_menu,
+    "resume": bench_resume,
+    "rules": bench_audio_rules,
+}
+
+
+def result_key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, "r") as f:
+        baseline = {result_key(r): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        before = baseline.get(result_key(result))
+        if not before:
+            continue
+        ratio = result["median_us"] / max(before["median_us"], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions.append((result, before, ratio))
+
+    for result, before, ratio in regressions:
+        print(
+            f"REGRESSION {result['name']} {result['params']}: "
+            f"{before['median_us']:.1f}us -> {result['median_us']:.1f}us "
+            f"({ratio:.2f}x)",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the NoSilence monitoring path."
+    )
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="fail if slower than these JSON results")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown against --baseline (default 0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--only", choices=sorted(BENCHMARKS), action="append", help="run a subset"
+    )
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    args = parser.parse_args()
+
+    # Keep benchmark output free of the app's log lines
+    main.console.quiet = True
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        for bench_name, params, stats in BENCHMARKS[name](args.quick):
+            results.append({"name": bench_name, "params": params, **stats})
+
+    report = {
+        "version": main.VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
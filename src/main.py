@@ -1,39 +1,117 @@
+import abc
+import argparse
+import bisect
 import ctypes
+import functools
 import json
+import math
 import os
+import queue
+import random
+import re
+import signal
+import socket
+import struct
 import sys
+import tempfile
 import threading
 import time
-import tkinter as tk
-import webbrowser
-from tkinter import messagebox, simpledialog
+import tracemalloc
+from array import array
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from urllib.parse import parse_qs, urlparse
 
-import pystray
-import pythoncom
-import spotipy
-import spotipy.exceptions
-from PIL import Image, ImageDraw
-from pycaw.pycaw import AudioUtilities, IAudioMeterInformation
-from pystray import MenuItem as item
+import requests
+from PIL import Image, ImageDraw, ImageFont
+from requests.adapters import HTTPAdapter
 from rich.console import Console
-from rich.traceback import install
-from spotipy.oauth2 import SpotifyOAuth
+from urllib3.util.retry import Retry
+
+if sys.platform == "win32":
+    import pythoncom
+    from pycaw.pycaw import AudioUtilities, IAudioMeterInformation
+else:
+    # Only the Windows backend uses these
+    pythoncom: Any = None
+    AudioUtilities: Any = None
+    IAudioMeterInformation: Any = None
+
+try:
+    import pystray
+    from pystray import MenuItem as item
+except Exception:
+    # No tray on this system (e.g. Linux without a display); --headless still works
+    pystray = None
+    item = None
 
-install()
 console = Console()
 
+
+class StartupTimer:
+    # Time since import at each startup milestone, logged once the tray icon
+    # is up. Created at import, so module setup counts too.
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.reported = False
+
+    def mark(self, name):
+        elapsed = time.perf_counter() - self.start
+        self.marks.append((name, elapsed))
+        if self.reported:
+            # e.g. Spotify sign-in finishing after the tray is up
+            console.log(f"Startup: {name} {elapsed * 1000:.0f} ms")
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        timings = ", ".join(f"{name} {t * 1000:.0f} ms" for name, t in self.marks)
+        console.log(f"Startup: {timings}")
+
+
+startup_timer = StartupTimer()
+
+
 # Global variables
 VERSION = "0.4.2"
 CLIENT_ID: str = ""
 CLIENT_SECRET: str = ""
-sp: spotipy.Spotify = None  # type: ignore
+# spotipy takes ~100 ms to import, so load_spotipy() brings it in on first use
+if TYPE_CHECKING:
+    import spotipy
+    import spotipy.cache_handler
+    import spotipy.exceptions
+    import spotipy.oauth2
+else:
+    spotipy = None
+sp: "spotipy.Spotify" = None  # type: ignore
 
 # Windows API for detecting open menus
-user32 = ctypes.windll.user32
+if sys.platform == "win32":
+    user32 = ctypes.windll.user32
+else:
+    user32 = None
+
+# Set by --headless: no tray, and sign-in prompts go to the terminal
+HEADLESS = False
+
+
+def hidden_tk_root():
+    # tkinter is only needed for the occasional dialog, so it's imported here
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw()
+    return root
 
 
 def is_menu_open():
+    if user32 is None:
+        return False
     # #32768 is the standard class name for a Windows context menu
     return user32.FindWindowW("#32768", None) != 0
 
@@ -84,15 +162,15 @@ def load_secrets():
         console.log(f"[red]{error_msg}[/red]")
 
         # Show a GUI error message if possible
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("Initialization Error", error_msg)
-        root.destroy()
+        if not HEADLESS:
+            from tkinter import messagebox
 
-        sys.exit(1)
+            root = hidden_tk_root()
+            messagebox.showerror("Initialization Error", error_msg)
+            root.destroy()
 
+        sys.exit(1)
 
-load_secrets()
 
 REDIRECT_URI = "https://127.0.0.1:8888"
 
@@ -101,9 +179,17 @@ SILENCE_THRESHOLD = 0.001
 # Default silence timeout (seconds)
 SILENCE_TIMEOUT = 30
 
-# Default polling interval (seconds)
+# Default polling interval (seconds). This is the baseline for the adaptive
+# scheduler: it backs off while paused or idle and speeds up near a resume.
 POLLING_INTERVAL = 1
 
+# Polling slowdown while paused / idle and not armed (multiples of the interval)
+PAUSED_POLLING_FACTOR = 5
+IDLE_POLLING_FACTOR = 2
+
+# Shortest sleep between polls when a resume is imminent (seconds)
+MIN_POLLING_INTERVAL = 0.05
+
 # Minimum duration of non-Spotify sound to trigger auto-resume (seconds)
 MIN_ACTIVATION_DURATION = 3
 
@@ -117,6 +203,102 @@ CHANGE_SYSTEM_VOLUME = True
 
 SPOTIFY_DEVICE_NAME = None
 
+# Alternative Spotify endpoints, e.g. tools/mock_spotify_server.py (None = Spotify)
+SPOTIFY_API_URL = None
+SPOTIFY_TOKEN_URL = None
+
+# Per-endpoint Spotify request budget: sustained calls per second and burst size
+SPOTIFY_CALL_RATE = 2
+SPOTIFY_CALL_BURST = 5
+
+# Longest Retry-After a call will sleep through before giving up (seconds)
+MAX_RETRY_AFTER_WAIT = 10
+
+# Consecutive Spotify network/server failures before calls start failing fast
+BREAKER_FAILURE_THRESHOLD = 3
+
+# Backoff between reconnection probes while Spotify is unreachable (seconds)
+BREAKER_BASE_BACKOFF = 5
+BREAKER_MAX_BACKOFF = 300
+
+# Keep-alive connections kept open to the Spotify API
+HTTP_POOL_SIZE = 4
+
+# How long before a resume the Spotify connection is re-established (seconds)
+CONNECTION_WARMUP_LEAD = 5
+
+# Minimum time between connection warm-ups (seconds)
+CONNECTION_WARMUP_INTERVAL = 30
+
+# How long before a resume the device and playback state are prefetched (seconds)
+PREFETCH_LEAD = 3
+
+# How long prefetched resume state stays usable (seconds)
+PREFETCH_MAX_AGE = 10
+
+# How long a fetched Spotify device list is trusted before refreshing (seconds)
+DEVICE_CACHE_TTL = 120
+
+# How long config changes are collected before being written (seconds)
+CONFIG_SAVE_DELAY = 0.5
+
+# How often config.json is checked for outside edits (seconds)
+CONFIG_WATCH_INTERVAL = 2
+
+# Size at which a recorded audio trace is rotated to <path>.1 (bytes)
+TRACE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rendered tray icon frames kept in memory
+ICON_CACHE_SIZE = 128
+
+# Minimum time between tray menu rebuilds (seconds)
+MENU_UPDATE_MIN_INTERVAL = 2
+
+# Minimum age of the device list before opening the tray menu refreshes it (seconds)
+DEVICE_MENU_REFRESH_MIN_AGE = 10
+
+# How often the audio session list is fully re-enumerated (seconds)
+SESSION_RESYNC_INTERVAL = 5
+
+# Check the output device's overall peak before reading individual sessions
+USE_MASTER_PEAK = True
+
+# How long each PulseAudio peak reading listens for (seconds)
+PULSE_PEAK_WINDOW = 0.05
+
+# Process names of the Spotify desktop app (Windows, Linux)
+SPOTIFY_PROCESS_NAMES = ("spotify.exe", "spotify")
+
+# Per-application rules: ignore an app, never resume while it's audible, or
+# give it its own silence threshold (see AudioRules)
+AUDIO_RULES: list[dict[str, Any]] = []
+
+# Processes whose audio rule lookups are cached by PID
+AUDIO_RULE_CACHE_SIZE = 1024
+
+# Refresh the Spotify access token this long before it expires (seconds)
+TOKEN_REFRESH_LEAD = 300
+
+# How often the token refresher re-reads the cached expiry (seconds)
+TOKEN_CHECK_INTERVAL = 60
+
+# Backoff between Spotify sign-in attempts at startup (seconds)
+AUTH_RETRY_BASE_BACKOFF = 2
+AUTH_RETRY_MAX_BACKOFF = 60
+
+# Serve the local JSON-RPC control API (see IpcServer)
+IPC_ENABLED = True
+
+# Local port for the /metrics endpoint (None = off)
+METRICS_PORT = None
+
+# Stack sampling period while profiling (seconds)
+PROFILE_SAMPLE_INTERVAL = 0.01
+
+# How often profiles are written out, and how many of each kind are kept
+PROFILE_DUMP_INTERVAL = 60
+PROFILE_KEEP_DUMPS = 10
+
 FALLBACK_DJ_URI = "spotify:playlist:37i9dQZF1EYkqdzj48dyYq"
 FALLBACK_PLAYLIST_URI = "spotify:playlist:37i9dQZF1DXcBWIGoYBM5M"
 
@@ -149,6 +331,8 @@ def load_config():
     global SPOTIFY_VOLUME_PERCENT, SYSTEM_VOLUME_PERCENT, POLLING_INTERVAL
     global CHANGE_SPOTIFY_VOLUME, CHANGE_SYSTEM_VOLUME
     global MIN_ACTIVATION_DURATION, REQUIRE_NON_SPOTIFY_SOUND
+    global SPOTIFY_API_URL, SPOTIFY_TOKEN_URL, METRICS_PORT, IPC_ENABLED
+    global AUDIO_RULES
     if os.path.exists(CONFIG_FILE):
         try:
             with open(CONFIG_FILE, "r") as f:
@@ -177,31 +361,557 @@ def load_config():
                 REQUIRE_NON_SPOTIFY_SOUND = cfg.get(
                     "require_non_spotify_sound", REQUIRE_NON_SPOTIFY_SOUND
                 )
+                SPOTIFY_API_URL = cfg.get("spotify_api_url", SPOTIFY_API_URL)
+                SPOTIFY_TOKEN_URL = cfg.get("spotify_token_url", SPOTIFY_TOKEN_URL)
+                METRICS_PORT = cfg.get("metrics_port", METRICS_PORT)
+                IPC_ENABLED = cfg.get("ipc_enabled", IPC_ENABLED)
+                AUDIO_RULES = cfg.get("audio_rules", AUDIO_RULES)
+            compile_audio_rules()
         except Exception as e:
             console.log(f"[yellow]Failed to load config:[/yellow] {e}")
 
 
+def config_snapshot():
+    return {
+        "spotify_device": SPOTIFY_DEVICE_NAME,
+        "silence_timeout": SILENCE_TIMEOUT,
+        "silence_threshold": SILENCE_THRESHOLD,
+        "spotify_volume_percent": SPOTIFY_VOLUME_PERCENT,
+        "system_volume_percent": SYSTEM_VOLUME_PERCENT,
+        "polling_interval": POLLING_INTERVAL,
+        "change_spotify_volume": CHANGE_SPOTIFY_VOLUME,
+        "change_system_volume": CHANGE_SYSTEM_VOLUME,
+        "min_activation_duration": MIN_ACTIVATION_DURATION,
+        "require_non_spotify_sound": REQUIRE_NON_SPOTIFY_SOUND,
+        "spotify_api_url": SPOTIFY_API_URL,
+        "spotify_token_url": SPOTIFY_TOKEN_URL,
+        "metrics_port": METRICS_PORT,
+        "ipc_enabled": IPC_ENABLED,
+        "audio_rules": AUDIO_RULES,
+    }
+
+
+def new_file_mode():
+    # The mode open() would give a new file; the umask can only be read by
+    # setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# Read once at import: setting the umask is process-wide, so doing it later
+# could race with another thread creating a file (e.g. the IPC socket)
+NEW_FILE_MODE = new_file_mode()
+
+
+def write_json_atomic(path, data, prefix=".config-", mode=None):
+    # Write next to the target and rename over it, so a crash mid-write
+    # leaves the old file intact. mkstemp() creates the file as 0600, so it
+    # gets the given mode, or else the existing file's (or a new file's)
+    # mode, before it replaces the target.
+    if mode is None:
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = NEW_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=prefix, suffix=".tmp"
+    )
+    try:
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigPersistence:
+    # save_config() only marks the config dirty. A background thread
+    # coalesces bursts of changes into one atomic write, and in between
+    # watches the file's mtime so edits made by hand or by deployment
+    # tooling are applied without a restart.
+
+    def __init__(
+        self,
+        path,
+        save_delay=CONFIG_SAVE_DELAY,
+        watch_interval=CONFIG_WATCH_INTERVAL,
+    ):
+        self.path = path
+        self.save_delay = save_delay
+        self.watch_interval = watch_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._save_due = None
+        self._known_mtime = None
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def remember_file(self):
+        self._known_mtime = self._mtime()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def request_save(self):
+        with self._lock:
+            self._save_due = time.monotonic() + self.save_delay
+        self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            pending, self._save_due = self._save_due, None
+        if pending is not None:
+            self._write()
+
+    def _write(self):
+        with self._write_lock:
+            try:
+                write_json_atomic(self.path, config_snapshot())
+                self._known_mtime = self._mtime()
+            except Exception as e:
+                console.log(f"[yellow]Failed to save config:[/yellow] {e}")
+
+    def _check_for_changes(self):
+        mtime = self._mtime()
+        if mtime is None or mtime == self._known_mtime:
+            return
+        self._known_mtime = mtime
+        load_config()
+        console.log("[blue]Config file changed on disk, reloaded.[/blue]")
+        scheduler.wake()
+
+    def _run(self):
+        while running:
+            with self._lock:
+                due = self._save_due
+            if due is None:
+                timeout = self.watch_interval
+            else:
+                timeout = max(0.0, due - time.monotonic())
+
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+            with self._lock:
+                due = self._save_due
+                save_now = due is not None and time.monotonic() >= due
+                if save_now:
+                    self._save_due = None
+
+            if save_now:
+                self._write()
+            elif due is None:
+                # Don't pick up outside edits while our own write is pending;
+                # it would overwrite them anyway
+                self._check_for_changes()
+
+
+config_persistence = ConfigPersistence(CONFIG_FILE)
+
+
 def save_config():
+    config_persistence.request_save()
+
+
+# ==========================================================
+# METRICS
+# ==========================================================
+
+# Upper bounds of the latency histogram buckets (seconds)
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self, lines):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} counter")
+        with self._lock:
+            for label_values, value in self._values.items():
+                labels = format_labels(self.labels, label_values)
+                lines.append(f"{self.name}{labels} {value}")
+
+    def snapshot(self):
+        with self._lock:
+            return {",".join(k): v for k, v in self._values.items()}
+
+
+class Histogram:
+    # Fixed buckets, so observe() is a bisect and three additions under a lock
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *label_values):
+        return HistogramTimer(self, label_values)
+
+    def render(self, lines):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} histogram")
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        with self._lock:
+            for label_values, (counts, total, count) in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    labels = format_labels(
+                        self.labels + ("le",), label_values + (bound,)
+                    )
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                ",".join(k): {"count": count, "sum": total}
+                for k, (_, total, count) in self._series.items()
+            }
+
+
+class HistogramTimer:
+    __slots__ = ("histogram", "label_values", "start")
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+
+
+class Gauge:
+    # Read from func() at scrape time, so it costs nothing in between
+
+    def __init__(self, name, help_text, func):
+        self.name = name
+        self.help_text = help_text
+        self.func = func
+
+    def render(self, lines):
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} gauge")
+        lines.append(f"{self.name} {self.func()}")
+
+    def snapshot(self):
+        return self.func()
+
+
+class Metrics:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines: list[str] = []
+        for metric in self.metrics:
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+
+metrics = Metrics()
+audio_state_seconds = metrics.add(
+    Histogram(
+        "nosilence_audio_state_seconds",
+        "Time to read audio levels, by whether the master peak settled it.",
+        ("path",),
+    )
+)
+poll_tick_seconds = metrics.add(
+    Histogram("nosilence_poll_tick_seconds", "Time spent in one monitor loop pass.")
+)
+spotify_call_seconds = metrics.add(
+    Histogram(
+        "nosilence_spotify_call_seconds",
+        "Latency of each Spotify API request.",
+        ("endpoint",),
+    )
+)
+spotify_call_errors = metrics.add(
+    Counter(
+        "nosilence_spotify_call_errors_total",
+        "Failed Spotify API requests.",
+        ("endpoint", "kind"),
+    )
+)
+spotify_throttled_seconds = metrics.add(
+    Counter(
+        "nosilence_spotify_throttled_seconds_total",
+        "Time spent waiting on Spotify rate limits.",
+        ("endpoint",),
+    )
+)
+resume_seconds = metrics.add(
+    Histogram("nosilence_resume_seconds", "Time spent in resume_spotify().")
+)
+resumes_total = metrics.add(
+    Counter("nosilence_resumes_total", "Resumes that ran, by outcome.", ("result",))
+)
+metrics.add(
+    Gauge(
+        "nosilence_audio_sessions",
+        "Audio sessions currently tracked.",
+        lambda: len(session_registry.entries),
+    )
+)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = metrics.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(metrics.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port):
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(
-                {
-                    "spotify_device": SPOTIFY_DEVICE_NAME,
-                    "silence_timeout": SILENCE_TIMEOUT,
-                    "silence_threshold": SILENCE_THRESHOLD,
-                    "spotify_volume_percent": SPOTIFY_VOLUME_PERCENT,
-                    "system_volume_percent": SYSTEM_VOLUME_PERCENT,
-                    "polling_interval": POLLING_INTERVAL,
-                    "change_spotify_volume": CHANGE_SPOTIFY_VOLUME,
-                    "change_system_volume": CHANGE_SYSTEM_VOLUME,
-                    "min_activation_duration": MIN_ACTIVATION_DURATION,
-                    "require_non_spotify_sound": REQUIRE_NON_SPOTIFY_SOUND,
-                },
-                f,
-                indent=2,
+        server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    except OSError as e:
+        console.log(f"[yellow]Metrics server unavailable:[/yellow] {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    console.log(f"Metrics at [cyan]http://127.0.0.1:{port}/metrics[/cyan]")
+    return server
+
+
+# ==========================================================
+# PROFILING
+# ==========================================================
+
+# "1" starts profiling at launch, "menu" only adds the tray toggle
+PROFILE_ENV_VAR = "NOSILENCE_PROFILE"
+PROFILE_DIR = os.path.join(os.path.dirname(CONFIG_FILE), "profiles")
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    # Samples the stacks of registered threads (monitor, tray, resume) into
+    # collapsed-stack counts, the format flamegraph.pl and speedscope read,
+    # and takes tracemalloc snapshots. Every dump interval both are written
+    # to PROFILE_DIR, keeping the newest few. Nothing runs while stopped;
+    # register_thread() is the only call made then.
+
+    def __init__(
+        self,
+        directory=PROFILE_DIR,
+        sample_interval=PROFILE_SAMPLE_INTERVAL,
+        dump_interval=PROFILE_DUMP_INTERVAL,
+        keep=PROFILE_KEEP_DUMPS,
+    ):
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.dump_interval = dump_interval
+        self.keep = keep
+        self.menu_visible = False
+        self.threads = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stacks = {}
+        self._last_snapshot = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def register_thread(self, name):
+        self.threads[threading.get_ident()] = name
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._stacks = {}
+            self._last_snapshot = None
+            tracemalloc.start()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        console.log(f"[yellow]Profiling on, writing to {self.directory}[/yellow]")
+
+    def stop(self):
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stop.set()
+        thread.join()
+        with self._lock:
+            self._thread = None
+        tracemalloc.stop()
+        console.log("[yellow]Profiling off[/yellow]")
+
+    def _run(self):
+        next_dump = time.monotonic() + self.dump_interval
+        while not self._stop.wait(self.sample_interval):
+            self.sample()
+            if time.monotonic() >= next_dump:
+                self.dump()
+                next_dump = time.monotonic() + self.dump_interval
+        self.dump()
+
+    def sample(self):
+        frames = sys._current_frames()
+        for ident, name in list(self.threads.items()):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame))
+                frame = frame.f_back
+            labels.append(name)
+            stack = ";".join(reversed(labels))
+            self._stacks[stack] = self._stacks.get(stack, 0) + 1
+
+    def dump(self):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_stacks(os.path.join(self.directory, f"stacks-{stamp}.txt"))
+            self._write_memory(os.path.join(self.directory, f"memory-{stamp}.txt"))
+            self._rotate()
+        except Exception as e:
+            console.log(f"[red]Failed to write profile:[/red] {e}")
+
+    def _write_stacks(self, path):
+        stacks, self._stacks = self._stacks, {}
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(stacks.items(), key=lambda s: -s[1]):
+                f.write(f"{stack} {count}\n")
+
+    def _write_memory(self, path):
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Traced memory: {current} bytes (peak {peak})\n\n")
+            f.write("Top allocations by line:\n")
+            for stat in snapshot.statistics("lineno")[:30]:
+                f.write(f"{stat}\n")
+            if self._last_snapshot is not None:
+                f.write("\nGrowth since the previous dump:\n")
+                diff = snapshot.compare_to(self._last_snapshot, "lineno")
+                for change in diff[:30]:
+                    f.write(f"{change}\n")
+        self._last_snapshot = snapshot
+
+    def _rotate(self):
+        for prefix in ("stacks-", "memory-"):
+            dumps = sorted(
+                name for name in os.listdir(self.directory) if name.startswith(prefix)
             )
-    except Exception as e:
-        console.log(f"[yellow]Failed to save config:[/yellow] {e}")
+            for name in dumps[: -self.keep]:
+                os.remove(os.path.join(self.directory, name))
+
+
+profiler = SamplingProfiler()
+
+
+def configure_profiling_from_env():
+    mode = os.environ.get(PROFILE_ENV_VAR, "").strip().lower()
+    if not mode or mode in ("0", "off"):
+        return
+    profiler.menu_visible = True
+    if mode != "menu":
+        profiler.start()
 
 
 # ==========================================================
@@ -210,6 +920,72 @@ def save_config():
 
 scope = "user-modify-playback-state,user-read-playback-state"
 
+SPOTIFY_API_BASE = "https://api.spotify.com/v1/"
+
+
+class SpotifyHttpPool:
+    # A single keep-alive session shared by the Spotify client and its auth
+    # manager, so a resume reuses an open connection instead of paying for
+    # DNS, TCP and TLS again. warm_async() re-opens it ahead of time.
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        self.session = requests.Session()
+        # Connection retries only. HTTP errors are left to safe_sp_call(), so
+        # a 5xx is seen as a server error (spotipy would report exhausted
+        # status retries as a header-less 429) and 429s honour Retry-After
+        # without blocking here.
+        retry = Retry(
+            total=3,
+            connect=None,
+            read=False,
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            status=0,
+            backoff_factor=0.3,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=2, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        # Plain HTTP is only used with a local stand-in server
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._warming = False
+        self._last_warm = None
+
+    def warm(self):
+        try:
+            # Any response (even a 401) leaves a live connection in the pool
+            self.session.head(SPOTIFY_API_URL or SPOTIFY_API_BASE, timeout=5)
+        except requests.RequestException as e:
+            console.log(f"[yellow]Connection warm-up failed:[/yellow] {e}")
+
+    def warm_async(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._warming:
+                return
+            if (
+                self._last_warm is not None
+                and now - self._last_warm < CONNECTION_WARMUP_INTERVAL
+            ):
+                return
+            self._warming = True
+            self._last_warm = now
+
+        def worker():
+            try:
+                self.warm()
+            finally:
+                with self._lock:
+                    self._warming = False
+
+        threading.Thread(target=worker, daemon=True).start()
+
+
+http_pool = SpotifyHttpPool()
+
 
 def get_auth_code_from_user():
     console.log("[blue]Waiting for Spotify redirect...[/blue]")
@@ -218,9 +994,17 @@ def get_auth_code_from_user():
         "paste it below.[/yellow]"
     )
 
+    if HEADLESS:
+        try:
+            manual_url = input("Redirect URL: ")
+        except EOFError:
+            manual_url = None
+        return parse_auth_code(manual_url)
+
     # Use a tkinter dialog for manual input
-    root = tk.Tk()
-    root.withdraw()
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     root.attributes("-topmost", True)
     manual_url = simpledialog.askstring(
         "Spotify Authentication",
@@ -229,6 +1013,10 @@ def get_auth_code_from_user():
     )
     root.destroy()
 
+    return parse_auth_code(manual_url)
+
+
+def parse_auth_code(manual_url):
     if manual_url:
         try:
             parsed_url = urlparse(manual_url)
@@ -240,83 +1028,404 @@ def get_auth_code_from_user():
     return None
 
 
+def load_spotipy():
+    global spotipy
+    import spotipy
+    import spotipy.cache_handler
+    import spotipy.exceptions
+    import spotipy.oauth2
+
+
+def create_token_cache(path):
+    # Defined here because spotipy is only imported on first use
+    class AtomicCacheFileHandler(spotipy.cache_handler.CacheFileHandler):
+        def save_token_to_cache(self, token_info):
+            try:
+                # The token grants account access; keep it private
+                write_json_atomic(
+                    self.cache_path, token_info, prefix=".cache-", mode=0o600
+                )
+            except OSError as e:
+                console.log(f"[yellow]Failed to save Spotify token:[/yellow] {e}")
+
+    return AtomicCacheFileHandler(cache_path=path)
+
+
 def init_spotify():
     global sp
-    auth_manager = SpotifyOAuth(
+    load_spotipy()
+    auth_manager = spotipy.oauth2.SpotifyOAuth(
         client_id=CLIENT_ID,
         client_secret=CLIENT_SECRET,
         redirect_uri=REDIRECT_URI,
         scope=scope,
         open_browser=False,
-        cache_path=CACHE_PATH,
+        cache_handler=create_token_cache(CACHE_PATH),
+        requests_session=http_pool.session,
     )
+    if SPOTIFY_TOKEN_URL:
+        auth_manager.OAUTH_TOKEN_URL = SPOTIFY_TOKEN_URL
 
     # Check if we already have a valid token
     token_info = None
     try:
         token_info = auth_manager.get_cached_token()
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        # Offline (e.g. at boot): retry later instead of asking to sign in again
+        raise
     except Exception:
         pass
 
     if not token_info:
         auth_url = auth_manager.get_authorize_url()
-        console.log("[blue]Opening browser for Spotify authentication...[/blue]")
-        webbrowser.open(auth_url)
+        if HEADLESS:
+            console.log(f"[blue]Open this URL to sign in to Spotify:[/blue] {auth_url}")
+        else:
+            console.log("[blue]Opening browser for Spotify authentication...[/blue]")
+            import webbrowser
+
+            webbrowser.open(auth_url)
 
         code = get_auth_code_from_user()
         if code:
             auth_manager.get_access_token(code)
             console.log("[green]Successfully authenticated with Spotify.[/green]")
         else:
-            raise RuntimeError("Authentication cancelled or failed.")
+            raise SpotifyAuthError("Authentication cancelled or failed.")
+
+    sp = spotipy.Spotify(
+        auth_manager=auth_manager,
+        requests_timeout=15,
+        requests_session=http_pool.session,
+    )
+    if SPOTIFY_API_URL:
+        sp.prefix = SPOTIFY_API_URL
+        console.log(f"[yellow]Using Spotify API at {SPOTIFY_API_URL}[/yellow]")
 
-    sp = spotipy.Spotify(auth_manager=auth_manager, requests_timeout=15)
 
+class SpotifyAuthError(RuntimeError):
+    pass
 
-def safe_sp_call(func, *args, retries=3, delay=2, **kwargs):
-    for attempt in range(retries):
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            if "name resolution" in str(e).lower() or "max retries" in str(e).lower():
-                console.log(
-                    f"[yellow]Network error detected ({attempt+1}/{retries}):[/yellow]"
-                    f" {e}"
+
+class SpotifyRateLimitedError(RuntimeError):
+    pass
+
+
+class SpotifyUnavailableError(RuntimeError):
+    pass
+
+
+def classify_spotify_error(e):
+    if spotipy is not None and isinstance(e, spotipy.exceptions.SpotifyException):
+        if e.http_status == 429:
+            # spotipy also reports exhausted urllib3 retries as a 429, but
+            # without the response headers a real one carries
+            if not e.headers:
+                return "server"
+            return "rate_limited"
+        if e.http_status is not None and e.http_status >= 500:
+            return "server"
+        return "client"
+    if isinstance(
+        e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ):
+        return "network"
+    return "other"
+
+
+def get_retry_after(e):
+    headers = getattr(e, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("Retry-After", 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        # Takes a token and returns how long the caller must wait before using it
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class CircuitBreaker:
+    # Shared by every Spotify call. After BREAKER_FAILURE_THRESHOLD network or
+    # server failures in a row it opens and calls fail fast. Once the backoff
+    # (exponential, with jitter) has passed it goes half-open and lets a
+    # single probe through; a success closes it, a failure re-opens it.
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        threshold=BREAKER_FAILURE_THRESHOLD,
+        base_backoff=BREAKER_BASE_BACKOFF,
+        max_backoff=BREAKER_MAX_BACKOFF,
+    ):
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._trips = 0
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+
+    def _advance(self):
+        if self.state == self.OPEN and time.monotonic() >= self._retry_at:
+            self.state = self.HALF_OPEN
+
+    def allows_calls(self):
+        with self._lock:
+            self._advance()
+            if self.state == self.HALF_OPEN:
+                return not self._probe_in_flight
+            return self.state == self.CLOSED
+
+    def before_call(self):
+        # Returns True if this call is the half-open probe
+        with self._lock:
+            self._advance()
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            wait = max(0.0, self._retry_at - time.monotonic())
+        raise SpotifyUnavailableError(
+            f"Spotify unreachable, next attempt in {wait:.0f}s"
+        )
+
+    def end_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            recovered = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trips = 0
+        if recovered:
+            console.log("[green]Spotify reachable again.[/green]")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.CLOSED and self._failures < self.threshold:
+                return
+            self._trips += 1
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._trips - 1))
+            # Equal jitter: somewhere between half and all of the backoff
+            delay = backoff / 2 + random.uniform(0, backoff / 2)
+            self._retry_at = time.monotonic() + delay
+            self.state = self.OPEN
+        console.log(
+            f"[yellow]Spotify unreachable. Next attempt in {delay:.0f}s.[/yellow]"
+        )
+
+
+circuit_breaker = CircuitBreaker()
+
+
+class SpotifyCallLayer:
+    # Every Spotify API call goes through here. Each endpoint gets its own
+    # token bucket, 429s honour Retry-After (and block the endpoint for that
+    # long if it's too long to wait out), and network errors are retried with
+    # a growing delay. Time spent waiting on rate limits is tracked. Outages
+    # are left to the shared circuit breaker.
+
+    def __init__(self, rate=SPOTIFY_CALL_RATE, burst=SPOTIFY_CALL_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._blocked_until = {}
+        self.throttled_seconds = {}
+
+    def _record_throttle(self, endpoint, seconds):
+        spotify_throttled_seconds.inc(endpoint, amount=seconds)
+        with self._lock:
+            total = self.throttled_seconds.get(endpoint, 0.0) + seconds
+            self.throttled_seconds[endpoint] = total
+        return total
+
+    def _acquire(self, endpoint):
+        with self._lock:
+            blocked_until = self._blocked_until.get(endpoint, 0.0)
+            if time.monotonic() < blocked_until:
+                remaining = blocked_until - time.monotonic()
+                raise SpotifyRateLimitedError(
+                    f"Spotify rate limit on {endpoint}, retry in {remaining:.0f}s"
                 )
-                time.sleep(delay * (attempt + 1))
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                bucket = self._buckets[endpoint] = TokenBucket(self.rate, self.burst)
+            wait = bucket.reserve()
+
+        if wait > 0:
+            self._record_throttle(endpoint, wait)
+            time.sleep(wait)
+
+    def call(self, func, *args, retries=3, delay=2, **kwargs):
+        endpoint = getattr(func, "__name__", repr(func))
+
+        probe = circuit_breaker.before_call()
+        try:
+            # A half-open probe gets exactly one attempt
+            return self._call(
+                endpoint, func, args, kwargs, 1 if probe else retries, delay
+            )
+        finally:
+            if probe:
+                circuit_breaker.end_probe()
+
+    def _call(self, endpoint, func, args, kwargs, retries, delay):
+        for attempt in range(retries):
+            self._acquire(endpoint)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                spotify_call_seconds.observe(time.perf_counter() - start, endpoint)
+                kind = classify_spotify_error(e)
+                spotify_call_errors.inc(endpoint, kind)
+                if kind in ("network", "server"):
+                    circuit_breaker.record_failure()
+
+                if kind == "network":
+                    console.log(
+                        f"[yellow]Network error detected ({attempt+1}/{retries}):"
+                        f"[/yellow] {e}"
+                    )
+                    if not circuit_breaker.allows_calls():
+                        raise SpotifyUnavailableError(
+                            "Spotify unreachable, giving up"
+                        ) from e
+                    if attempt + 1 < retries:
+                        time.sleep(delay * (attempt + 1))
+                elif kind == "rate_limited":
+                    retry_after = get_retry_after(e)
+                    total = self._record_throttle(endpoint, retry_after)
+                    console.log(
+                        f"[yellow]Rate limited on {endpoint} for "
+                        f"{retry_after:.0f}s ({total:.0f}s lost so far)[/yellow]"
+                    )
+                    if retry_after > MAX_RETRY_AFTER_WAIT or attempt + 1 >= retries:
+                        # Too long to wait out, or nothing left to wait for:
+                        # block the endpoint instead of sleeping
+                        with self._lock:
+                            self._blocked_until[endpoint] = (
+                                time.monotonic() + retry_after
+                            )
+                        raise SpotifyRateLimitedError(
+                            f"Spotify rate limit on {endpoint}, "
+                            f"retry in {retry_after:.0f}s"
+                        ) from e
+                    time.sleep(retry_after)
+                else:
+                    raise
             else:
-                raise e  # Re-raise other exceptions
-    raise RuntimeError("Spotify call failed after retries due to network issues")
+                spotify_call_seconds.observe(time.perf_counter() - start, endpoint)
+                circuit_breaker.record_success()
+                return result
+        raise RuntimeError("Spotify call failed after retries")
+
+
+spotify_calls = SpotifyCallLayer()
+
+
+def safe_sp_call(func, *args, retries=3, delay=2, **kwargs):
+    return spotify_calls.call(func, *args, retries=retries, delay=delay, **kwargs)
 
 
 # ==========================================================
 # STATE
 # ==========================================================
 
-last_sound_time = time.time()
+monitor_state: "MonitorState" = None  # type: ignore
 running = True
 paused = False
-non_spotify_sound_detected = False
-non_spotify_active_start_time = 0.0
 timeout_lock = threading.Lock()
 threshold_lock = threading.Lock()
 paused_lock = threading.Lock()
 countdown_text = "Monitoring..."
+menu_was_open = False
+spotify_connection_state = CircuitBreaker.CLOSED
 tray_icon = None
 
 
-def create_icon_image(color=(30, 215, 96)):
-    img = Image.new("RGB", (64, 64), color)
+ICON_COLORS = {
+    "active": (30, 215, 96),  # Spotify Green
+    "paused": (255, 60, 60),  # Red
+    "unarmed": (120, 120, 120),  # Gray
+    "armed": (255, 215, 0),  # Yellow
+}
+
+SM_CXSMICON = 49
+
+
+def get_icon_size():
+    if user32 is None:
+        return 64
+    # Tray icons use the small icon size, which follows DPI
+    size = user32.GetSystemMetrics(SM_CXSMICON)
+    return size if size > 0 else 64
+
+
+@functools.lru_cache(maxsize=8)
+def load_badge_font(size):
+    try:
+        return ImageFont.truetype("arialbd.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def format_badge(remaining_seconds):
+    if remaining_seconds < 100:
+        return str(remaining_seconds)
+    # Rounded up, so it never shows less time than is left
+    return f"{math.ceil(remaining_seconds / 60)}m"
+
+
+def create_icon_image(color=(30, 215, 96), size=64, badge=None):
+    img = Image.new("RGB", (size, size), color)
     draw = ImageDraw.Draw(img)
-    draw.ellipse((16, 16, 48, 48), fill="black")
+    if badge is None:
+        draw.ellipse((size // 4, size // 4, size * 3 // 4, size * 3 // 4), fill="black")
+        return img
+
+    # Bigger disc so the countdown stays legible at tray size
+    draw.ellipse((size // 8, size // 8, size * 7 // 8, size * 7 // 8), fill="black")
+    font = load_badge_font(max(8, size // 2 if len(badge) < 3 else size * 3 // 8))
+    draw.text((size / 2, size / 2), badge, fill="white", font=font, anchor="mm")
     return img
 
 
-ICON_ACTIVE = create_icon_image((30, 215, 96))  # Spotify Green
-ICON_PAUSED = create_icon_image((255, 60, 60))  # Red
-ICON_UNARMED = create_icon_image((120, 120, 120))  # Gray
-ICON_ARMED = create_icon_image((255, 215, 0))  # Yellow
-current_icon_state = "active"
+@functools.lru_cache(maxsize=ICON_CACHE_SIZE)
+def render_icon(state, badge=None, size=64):
+    # Frames are keyed on the badge text (from format_badge()), so every
+    # second of a "5m" stretch shares one frame, and are reused across
+    # countdowns
+    return create_icon_image(ICON_COLORS[state], size, badge)
+
+
+icon_size = 64
+current_icon_frame = ("active", None)
 
 
 # ==========================================================
@@ -324,66 +1433,733 @@ current_icon_state = "active"
 # ==========================================================
 
 
+class AudioSessionBackend(abc.ABC):
+    # Source of per-application audio sessions, plus the output device's
+    # volume. The registry and set_system_volume() only talk to this
+    # interface, so the platform's sound API (or a fake) can sit behind it.
+
+    def init_thread(self):
+        # Called on each thread before it uses the backend
+        pass
+
+    @abc.abstractmethod
+    def list_sessions(self):
+        # Return {key: handle} for every session the system currently knows
+        pass
+
+    @abc.abstractmethod
+    def open_meter(self, handle):
+        pass
+
+    @abc.abstractmethod
+    def read_peak(self, meter):
+        pass
+
+    @abc.abstractmethod
+    def process_name(self, handle):
+        pass
+
+    def session_details(self, handle):
+        # Optional: (executable path, display name, PID) for audio rules
+        return "", "", None
+
+    def open_master_meter(self):
+        # Optional: meter for the default output device as a whole, read with
+        # read_peak(). None means per-session reads are always needed.
+        return None
+
+    def watch(self, on_change):
+        # Optional: call on_change() whenever a new session appears
+        pass
+
+    @abc.abstractmethod
+    def set_master_volume(self, percent):
+        pass
+
+
+class PycawSessionBackend(AudioSessionBackend):
+    # Windows Core Audio through pycaw/COM
+
+    def __init__(self):
+        self._manager = None
+        self._notification = None
+
+    def init_thread(self):
+        try:
+            pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        except pythoncom.com_error:
+            # Already in a single-threaded apartment (e.g. the main thread,
+            # which importing pythoncom initialises); calls still work there
+            pass
+
+    def list_sessions(self):
+        sessions = {}
+        for session in AudioUtilities.GetAllSessions():
+            sessions[(session.ProcessId, session.InstanceIdentifier)] = session
+        return sessions
+
+    def open_meter(self, session):
+        return session._ctl.QueryInterface(IAudioMeterInformation)
+
+    def read_peak(self, meter):
+        return meter.GetPeakValue()
+
+    def process_name(self, session):
+        if session.Process:
+            return session.Process.name().lower()
+        return ""
+
+    def session_details(self, session):
+        path = ""
+        if session.Process:
+            try:
+                path = session.Process.exe()
+            except Exception:
+                # e.g. access denied for an elevated process
+                pass
+        return path, session.DisplayName or "", session.ProcessId
+
+    def open_master_meter(self):
+        import comtypes
+
+        speakers = AudioUtilities.GetSpeakers()
+        interface = speakers._dev.Activate(
+            IAudioMeterInformation._iid_, comtypes.CLSCTX_ALL, None
+        )
+        return interface.QueryInterface(IAudioMeterInformation)
+
+    def watch(self, on_change):
+        try:
+            from pycaw.callbacks import AudioSessionNotification
+        except ImportError:
+            # Older pycaw: rely on the periodic resync only
+            return
+
+        class SessionCreatedNotification(AudioSessionNotification):
+            def on_session_created(self, new_session):
+                on_change()
+
+        # Windows delivers session notifications on its own thread pool, which
+        # only reaches objects in the multithreaded apartment; a
+        # single-threaded one without a message pump never sees them. So they
+        # are registered from a thread that joins the MTA and stays in it,
+        # whatever apartment the caller is in.
+        registered = threading.Event()
+        errors = []
+
+        def register():
+            pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+            try:
+                self._manager = AudioUtilities.GetAudioSessionManager()
+                self._notification = SessionCreatedNotification()
+                self._manager.RegisterSessionNotification(self._notification)
+                # Windows only starts reporting new sessions once they've been
+                # enumerated
+                self._manager.GetSessionEnumerator()
+            except Exception as e:
+                errors.append(e)
+                registered.set()
+                return
+            registered.set()
+            # Stay in the apartment for as long as the app runs
+            threading.Event().wait()
+
+        threading.Thread(target=register, daemon=True).start()
+        registered.wait()
+        if errors:
+            raise errors[0]
+
+    def set_master_volume(self, percent):
+        devices = AudioUtilities.GetSpeakers()
+
+        volume = devices.EndpointVolume
+
+        scalar = max(0.0, min(1.0, percent / 100.0))
+
+        volume.SetMute(0, None)
+        volume.SetMasterVolumeLevelScalar(scalar, None)
+
+
+class PulseAudioBackend(AudioSessionBackend):
+    # PulseAudio, or PipeWire through pipewire-pulse, via the optional
+    # pulsectl package. Each peak comes from a short peak-detect recording of
+    # one stream, so a full read takes PULSE_PEAK_WINDOW per stream; the
+    # master peak fast path keeps that to one window while it's quiet.
+
+    def __init__(self, peak_window=PULSE_PEAK_WINDOW):
+        self.peak_window = peak_window
+        self._pulse: Any = None
+        # The pulsectl module, imported with the first connection
+        self._pulsectl: Any = None
+        # pulsectl connections aren't thread-safe
+        self._lock = threading.Lock()
+
+    def _call(self, func):
+        with self._lock:
+            if self._pulse is None:
+                import pulsectl
+
+                self._pulsectl = pulsectl
+                self._pulse = pulsectl.Pulse("nosilence")
+            try:
+                return func(self._pulse)
+            except Exception as e:
+                if isinstance(e, self._pulsectl.PulseDisconnected):
+                    # e.g. the sound server restarted; reconnect next call
+                    self._pulse.close()
+                    self._pulse = None
+                raise
+
+    def list_sessions(self):
+        sink_inputs = self._call(lambda pulse: pulse.sink_input_list())
+        return {sink_input.index: sink_input for sink_input in sink_inputs}
+
+    def open_meter(self, sink_input):
+        # The sink is looked up on each read instead, since a stream can be
+        # moved to another sink while it plays
+        return None, sink_input.index
+
+    def read_peak(self, meter):
+        source, stream_index = meter
+
+        def read(pulse):
+            monitor_source = source
+            if monitor_source is None:
+                sink = pulse.sink_info(pulse.sink_input_info(stream_index).sink)
+                monitor_source = sink.monitor_source
+            return pulse.get_peak_sample(monitor_source, self.peak_window, stream_index)
+
+        return self._call(read)
+
+    def process_name(self, sink_input):
+        props = sink_input.proplist
+        name = props.get("application.process.binary") or props.get(
+            "application.name", ""
+        )
+        return name.lower()
+
+    def session_details(self, sink_input):
+        props = sink_input.proplist
+        pid = props.get("application.process.id", "")
+        pid = int(pid) if pid.isdigit() else None
+        path = ""
+        if pid is not None:
+            try:
+                path = os.readlink(f"/proc/{pid}/exe")
+            except OSError:
+                pass
+        return path, props.get("application.name", ""), pid
+
+    def open_master_meter(self):
+        sink = self._call(lambda pulse: pulse.sink_default_get())
+        return sink.monitor_source, None
+
+    def set_master_volume(self, percent):
+        scalar = max(0.0, min(1.0, percent / 100.0))
+
+        def apply(pulse):
+            sink = pulse.sink_default_get()
+            pulse.mute(sink, False)
+            pulse.volume_set_all_chans(sink, scalar)
+
+        self._call(apply)
+
+
+class FakeAudioBackend(AudioSessionBackend):
+    # Scripted sessions for tests, CI and benchmarks, one per process name.
+    # set_peak() adds or updates a session and remove() ends it; the master
+    # peak is the loudest session, kept up to date as they change so reading
+    # it costs the same however many sessions there are.
+
+    def __init__(self, peaks=None):
+        self.peaks = dict(peaks or {})
+        self.master_volume = None
+        self._master = object()
+        self._master_peak = max(self.peaks.values(), default=0.0)
+        self._on_change = None
+
+    def set_peak(self, process_name, peak):
+        is_new = process_name not in self.peaks
+        self.peaks[process_name] = peak
+        self._master_peak = max(self.peaks.values())
+        if is_new and self._on_change:
+            self._on_change()
+
+    def remove(self, process_name):
+        self.peaks.pop(process_name, None)
+        self._master_peak = max(self.peaks.values(), default=0.0)
+
+    def list_sessions(self):
+        return {name: name for name in self.peaks}
+
+    def open_meter(self, process_name):
+        return process_name
+
+    def read_peak(self, meter):
+        if meter is self._master:
+            return self._master_peak
+        # KeyError once removed, which drops it from the registry
+        return self.peaks[meter]
+
+    def process_name(self, process_name):
+        return process_name
+
+    def open_master_meter(self):
+        return self._master
+
+    def watch(self, on_change):
+        self._on_change = on_change
+
+    def set_master_volume(self, percent):
+        self.master_volume = percent
+
+
+AUDIO_BACKENDS = {
+    "windows": PycawSessionBackend,
+    "pulse": PulseAudioBackend,
+    "fake": FakeAudioBackend,
+}
+
+
+def create_audio_backend(name=None):
+    if name is None:
+        name = "windows" if sys.platform == "win32" else "pulse"
+    return AUDIO_BACKENDS[name]()
+
+
+# How a session's sound counts towards the resume logic
+SESSION_SPOTIFY = "spotify"
+SESSION_OTHER = "other"
+SESSION_IGNORED = "ignore"
+SESSION_BLOCKING = "never_resume"
+
+AUDIO_RULE_ACTIONS = (SESSION_SPOTIFY, SESSION_OTHER, SESSION_IGNORED, SESSION_BLOCKING)
+AUDIO_RULE_FIELDS = ("exe", "path", "name")
+
+
+def glob_to_regex(pattern):
+    # * and ? wildcards only, so paths with [brackets] match literally
+    return re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".") + r"\Z"
+
+
+def parse_audio_rule(rule):
+    if not isinstance(rule, dict):
+        raise ValueError("expected an object")
+    fields = [field for field in AUDIO_RULE_FIELDS if field in rule]
+    if len(fields) != 1:
+        raise ValueError("needs exactly one of exe, path or name")
+    pattern = rule[fields[0]]
+    if not isinstance(pattern, str):
+        raise ValueError(f"{fields[0]} must be a string")
+    action = rule.get("action")
+    if action is not None and action not in AUDIO_RULE_ACTIONS:
+        raise ValueError(f"unknown action {action!r}")
+    threshold = rule.get("threshold")
+    if threshold is not None:
+        threshold = float(threshold)
+    if action is None and threshold is None:
+        raise ValueError("needs an action or a threshold")
+    return fields[0], pattern.casefold(), action, threshold
+
+
+class AudioRules:
+    # The audio_rules config, compiled once. Each rule matches sessions by
+    # executable name, executable path or session display name
+    # (case-insensitive, * and ? wildcards) and sets an action, a threshold
+    # or both; the first matching rule wins. Plain names are looked up in a
+    # dict per field and each field's wildcards share one alternation regex,
+    # so a lookup is three dict probes and at most three regex matches.
+    # Results are cached per PID, and the registry only asks when a session
+    # first appears, so the rules cost nothing per poll.
+
+    def __init__(self, rules=()):
+        # (action or None, threshold or None) per rule, in config order
+        self.rules: list[tuple[Optional[str], Optional[float]]] = []
+        self._exact: dict[str, dict[str, int]] = {
+            field: {} for field in AUDIO_RULE_FIELDS
+        }
+        patterns: dict[str, list[str]] = {field: [] for field in AUDIO_RULE_FIELDS}
+        for rule in rules:
+            try:
+                field, pattern, action, threshold = parse_audio_rule(rule)
+            except (TypeError, ValueError) as e:
+                console.log(f"[yellow]Ignoring audio rule {rule!r}:[/yellow] {e}")
+                continue
+            index = len(self.rules)
+            self.rules.append((action, threshold))
+            if "*" in pattern or "?" in pattern:
+                patterns[field].append(f"(?P<r{index}>{glob_to_regex(pattern)})")
+            else:
+                self._exact[field].setdefault(pattern, index)
+        # Alternatives are tried in order, so the first one to match is also
+        # the earliest rule
+        self._patterns = {
+            field: re.compile("|".join(alternatives))
+            for field, alternatives in patterns.items()
+            if alternatives
+        }
+        # The master peak fast path has to use the lowest threshold in play
+        self.min_threshold = min(
+            (threshold for _, threshold in self.rules if threshold is not None),
+            default=None,
+        )
+        self._by_pid: dict[int, tuple[tuple, tuple[str, Optional[float]]]] = {}
+
+    def _match(self, field, value):
+        # Index of the first rule matching value in field, or None
+        if not value:
+            return None
+        value = value.casefold()
+        index = self._exact[field].get(value)
+        regex = self._patterns.get(field)
+        if regex is not None:
+            match = regex.match(value)
+            if match is not None and match.lastgroup is not None:
+                found = int(match.lastgroup[1:])
+                if index is None or found < index:
+                    index = found
+        return index
+
+    def classify(self, exe, path="", display_name="", pid=None):
+        # Returns (kind, threshold), where a threshold of None means the
+        # global silence threshold
+        default = SESSION_SPOTIFY if exe in SPOTIFY_PROCESS_NAMES else SESSION_OTHER
+        if not self.rules:
+            return default, None
+
+        key = (exe, path, display_name)
+        if pid is not None:
+            cached = self._by_pid.get(pid)
+            # The key guards against a PID being reused by another program
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        matches = [
+            index
+            for index in (
+                self._match("exe", exe),
+                self._match("path", path),
+                self._match("name", display_name),
+            )
+            if index is not None
+        ]
+        action, threshold = self.rules[min(matches)] if matches else (None, None)
+        result = (action or default, threshold)
+
+        if pid is not None:
+            if len(self._by_pid) >= AUDIO_RULE_CACHE_SIZE:
+                self._by_pid.clear()
+            self._by_pid[pid] = (key, result)
+        return result
+
+
+audio_rules = AudioRules(AUDIO_RULES)
+
+
+def compile_audio_rules():
+    # Swapping in a new object makes the registry reclassify its sessions
+    global audio_rules
+    audio_rules = AudioRules(AUDIO_RULES)
+
+
+class SessionEntry:
+    __slots__ = ("handle", "meter", "process_name", "kind", "threshold")
+
+    def __init__(self, handle, meter, process_name, kind, threshold):
+        self.handle = handle
+        self.meter = meter
+        self.process_name = process_name
+        self.kind = kind
+        self.threshold = threshold
+
+
+class AudioSessionRegistry:
+    # Long-lived view of the system's audio sessions. Meters and process names
+    # are resolved once per session; enumeration only happens when the backend
+    # reports a new session or the resync interval elapses (which also drops
+    # sessions that have expired).
+
+    def __init__(self, backend, resync_interval=SESSION_RESYNC_INTERVAL):
+        self.backend = backend
+        self.resync_interval = resync_interval
+        self.entries: dict[Any, SessionEntry] = {}
+        self._dirty = True
+        self._last_sync = 0.0
+        self._master_meter = None
+        self._master_opened = float("-inf")
+        self._master_supported = True
+        # The AudioRules the entries were classified with
+        self._rules = audio_rules
+
+    def start(self):
+        try:
+            self.backend.watch(self.mark_dirty)
+        except Exception as e:
+            console.log(f"[yellow]Session notifications unavailable:[/yellow] {e}")
+        try:
+            self.sync()
+        except Exception as e:
+            # e.g. the sound service isn't up yet at logon; still dirty, so
+            # the next read retries
+            console.log(f"[yellow]Could not list audio sessions:[/yellow] {e}")
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def sync(self):
+        current = self.backend.list_sessions()
+
+        for key in list(self.entries):
+            if key not in current:
+                del self.entries[key]
+
+        for key, handle in current.items():
+            if key in self.entries:
+                continue
+            try:
+                meter = self.backend.open_meter(handle)
+                name = self.backend.process_name(handle)
+                details = self.backend.session_details(handle)
+            except Exception:
+                continue
+            kind, threshold = self._rules.classify(name, *details)
+            self.entries[key] = SessionEntry(handle, meter, name, kind, threshold)
+
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def reclassify(self):
+        # Runs on the monitor thread, since it may call into the backend
+        self._rules = rules = audio_rules
+        for entry in list(self.entries.values()):
+            try:
+                details = self.backend.session_details(entry.handle)
+            except Exception:
+                details = ()
+            entry.kind, entry.threshold = rules.classify(entry.process_name, *details)
+
+    def read_peaks(self):
+        # Returns (process_name, peak, kind, threshold) for every session
+        if self._dirty or time.monotonic() - self._last_sync >= self.resync_interval:
+            self.sync()
+        if self._rules is not audio_rules:
+            self.reclassify()
+
+        readings = []
+        for key, entry in list(self.entries.items()):
+            try:
+                peak = self.backend.read_peak(entry.meter)
+            except Exception:
+                # The meter died with its session; forget it until it reappears
+                del self.entries[key]
+                continue
+            readings.append((entry.process_name, peak, entry.kind, entry.threshold))
+        return readings
+
+    def read_master_peak(self):
+        # Peak of the whole output mix, or None if it can't be read. The meter
+        # is reopened every resync interval so a change of default device is
+        # picked up.
+        if not self._master_supported:
+            return None
+
+        now = time.monotonic()
+        if now - self._master_opened >= self.resync_interval:
+            self._master_opened = now
+            try:
+                self._master_meter = self.backend.open_master_meter()
+            except Exception:
+                # e.g. no output device right now; try again next interval
+                self._master_meter = None
+                return None
+            if self._master_meter is None:
+                self._master_supported = False
+                return None
+
+        if self._master_meter is None:
+            return None
+        try:
+            return self.backend.read_peak(self._master_meter)
+        except Exception:
+            self._master_meter = None
+            return None
+
+
+session_registry: AudioSessionRegistry = AudioSessionRegistry(create_audio_backend())
+
+
 def get_audio_state():
+    start = time.perf_counter()
+    with threshold_lock:
+        threshold = SILENCE_THRESHOLD
+
+    # The mix can't be louder than silent if every session in it is silent, so
+    # one endpoint read settles most ticks. Recording needs every session's
+    # level, so it always takes the slow path.
+    if USE_MASTER_PEAK and trace_recorder is None:
+        master_threshold = threshold
+        if audio_rules.min_threshold is not None:
+            master_threshold = min(threshold, audio_rules.min_threshold)
+        try:
+            peak = session_registry.read_master_peak()
+        except Exception:
+            peak = None
+        if peak is not None and peak <= master_threshold:
+            audio_state_seconds.observe(time.perf_counter() - start, "master")
+            return False, False, False
+
     try:
-        sessions = AudioUtilities.GetAllSessions()
+        readings = session_registry.read_peaks()
     except Exception:
-        return False, False
+        readings = []
+    audio_state_seconds.observe(time.perf_counter() - start, "sessions")
+
+    if trace_recorder is not None:
+        trace_recorder.record(time.time(), readings)
 
+    return classify_readings(readings, threshold)
+
+
+def classify_readings(readings, threshold):
+    # Returns (spotify_playing, others_playing, blocking_playing), where
+    # blocking means a never-resume app is audible
     spotify_playing = False
     others_playing = False
+    blocking_playing = False
 
-    with threshold_lock:
-        threshold = SILENCE_THRESHOLD
+    for process_name, peak, kind, session_threshold in readings:
+        if session_threshold is None:
+            session_threshold = threshold
+        if peak > session_threshold:
+            if kind == SESSION_SPOTIFY:
+                spotify_playing = True
+            elif kind == SESSION_OTHER:
+                others_playing = True
+            elif kind == SESSION_BLOCKING:
+                blocking_playing = True
 
-    for session in sessions:
-        try:
-            meter = session._ctl.QueryInterface(IAudioMeterInformation)
-            peak = meter.GetPeakValue()
+    return spotify_playing, others_playing, blocking_playing
 
-            if peak > threshold:
-                if session.Process and session.Process.name().lower() == "spotify.exe":
-                    spotify_playing = True
-                else:
-                    others_playing = True
 
-        except Exception:
-            continue
+# ==========================================================
+# SYSTEM VOLUME CONTROL
+# ==========================================================
+
+
+def set_system_volume(percent):
+    session_registry.backend.set_master_volume(percent)
+
+
+# ==========================================================
+# SPOTIFY DEVICE & VOLUME
+# ==========================================================
+
+
+class DeviceCache:
+    # Spotify device list shared by the resume path and the Devices menu.
+    # A stale list is still served while a background refresh runs; callers
+    # invalidate() it when Spotify says a cached ID no longer exists.
+    # version increases with every successful fetch so the tray knows when to
+    # re-render.
+
+    def __init__(self, ttl=DEVICE_CACHE_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self.last_error = None
+        self._devices = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def seed(self, devices):
+        with self._lock:
+            self._devices = list(devices)
+            self._fetched_at = time.monotonic()
+            self.last_error = None
+            self.version += 1
+
+    def invalidate(self):
+        # Keep the list around for the menu but force the next lookup to fetch
+        with self._lock:
+            self._fetched_at = None
+
+    def snapshot(self):
+        # Returns (devices, age) without touching the network; devices is None
+        # until the first fetch succeeds
+        with self._lock:
+            if self._fetched_at is None:
+                return self._devices, float("inf")
+            return self._devices, time.monotonic() - self._fetched_at
+
+    def refresh(self):
+        try:
+            devices = safe_sp_call(sp.devices)
+        except Exception as e:
+            self.last_error = e
+            raise
+        available_devices = devices.get("devices", []) if devices else []
+        self.seed(available_devices)
+        return available_devices
+
+    def refresh_async(self):
+        if not spotify_connector.ready:
+            # Fetched once sign-in completes
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def worker():
+            try:
+                self.refresh()
+            except Exception as e:
+                console.log(f"[yellow]Background device refresh failed:[/yellow] {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
 
-    return spotify_playing, others_playing
+        threading.Thread(target=worker, daemon=True).start()
 
+    def refresh_if_older(self, max_age):
+        _, age = self.snapshot()
+        if age >= max_age:
+            self.refresh_async()
 
-# ==========================================================
-# SYSTEM VOLUME CONTROL
-# ==========================================================
+    def lookup(self, device_name):
+        devices, age = self.snapshot()
 
+        fetched = False
+        if devices is None or age == float("inf"):
+            devices = self.refresh()
+            fetched = True
+        elif age >= self.ttl:
+            self.refresh_async()
 
-def set_system_volume(percent):
-    devices = AudioUtilities.GetSpeakers()
+        device_id = find_device_id(devices, device_name)
+        if device_id is None and not fetched:
+            # The device may have come online since the last fetch
+            device_id = find_device_id(self.refresh(), device_name)
+        return device_id
 
-    volume = devices.EndpointVolume
 
-    scalar = max(0.0, min(1.0, percent / 100.0))
+device_cache = DeviceCache()
 
-    volume.SetMute(0, None)
-    volume.SetMasterVolumeLevelScalar(scalar, None)
 
+def find_device_id(devices, device_name):
+    for device in devices:
+        if device["name"] == device_name:
+            return device["id"]
 
-# ==========================================================
-# SPOTIFY DEVICE & VOLUME
-# ==========================================================
+    return None
 
 
 def get_device_id_by_name(device_name):
-    devices = safe_sp_call(sp.devices)
-    if not devices:
-        return None
+    return device_cache.lookup(device_name)
 
-    for device in devices["devices"]:
-        if device["name"] == device_name:
-            return device["id"]
 
-    return None
+def is_device_not_found(e):
+    return e.http_status == 404 and "device not found" in str(e.msg).lower()
 
 
 def set_spotify_volume(device_id):
@@ -395,24 +2171,125 @@ def set_spotify_volume(device_id):
 # ==========================================================
 
 
+def start_playback_on(device_id, **kwargs):
+    # Returns the device ID playback was started on, which differs from the
+    # one passed in when the cached ID turned out to be stale
+    try:
+        safe_sp_call(sp.start_playback, device_id=device_id, **kwargs)
+        return device_id
+    except spotipy.exceptions.SpotifyException as e:
+        if not is_device_not_found(e):
+            raise
+
+    console.log("[blue]Cached device ID is stale. Refreshing devices...[/blue]")
+    device_cache.invalidate()
+    fresh_id = get_device_id_by_name(SPOTIFY_DEVICE_NAME)
+    if not fresh_id or fresh_id == device_id:
+        raise RuntimeError(f"Device '{SPOTIFY_DEVICE_NAME}' not found.")
+
+    safe_sp_call(sp.start_playback, device_id=fresh_id, **kwargs)
+    return fresh_id
+
+
+class PrefetchedResume:
+    __slots__ = ("device_name", "device_id", "is_playing", "fetched_at")
+
+    def __init__(self, device_name, device_id, is_playing, fetched_at):
+        self.device_name = device_name
+        self.device_id = device_id
+        self.is_playing = is_playing
+        self.fetched_at = fetched_at
+
+
+class ResumePrefetcher:
+    # Runs the read-only half of a resume (token refresh, device lookup,
+    # playback state) in the countdown window, so the resume itself is just
+    # start_playback, or nothing if Spotify is already playing.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._running = False
+
+    def _is_fresh(self, snapshot):
+        return (
+            snapshot is not None
+            and snapshot.device_name == SPOTIFY_DEVICE_NAME
+            and time.monotonic() - snapshot.fetched_at < PREFETCH_MAX_AGE
+        )
+
+    def start(self):
+        with self._lock:
+            if self._running or self._is_fresh(self._snapshot):
+                return
+            self._running = True
+
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            # Refreshes the access token now if it's about to expire.
+            # get_access_token() would fall back to an interactive sign-in
+            # here if the cached token is missing or invalid, so that case
+            # is left to the resume itself.
+            auth_manager = sp.auth_manager
+            token_info = auth_manager.validate_token(
+                auth_manager.cache_handler.get_cached_token()
+            )
+            if token_info is None:
+                return
+            device_name = SPOTIFY_DEVICE_NAME
+            device_id = get_device_id_by_name(device_name)
+            playback = safe_sp_call(sp.current_playback)
+            snapshot = PrefetchedResume(
+                device_name,
+                device_id,
+                bool(playback and playback.get("is_playing")),
+                time.monotonic(),
+            )
+            with self._lock:
+                self._snapshot = snapshot
+        except Exception as e:
+            console.log(f"[yellow]Resume prefetch failed:[/yellow] {e}")
+        finally:
+            with self._lock:
+                self._running = False
+
+    def take(self):
+        with self._lock:
+            snapshot, self._snapshot = self._snapshot, None
+        return snapshot if self._is_fresh(snapshot) else None
+
+
+resume_prefetcher = ResumePrefetcher()
+
+
 def resume_spotify():
     try:
-        device_id = get_device_id_by_name(SPOTIFY_DEVICE_NAME)
+        prefetched = resume_prefetcher.take()
+        if prefetched:
+            device_id = prefetched.device_id
+        else:
+            device_id = get_device_id_by_name(SPOTIFY_DEVICE_NAME)
 
         if not device_id:
             console.log(f"[yellow]Device '{SPOTIFY_DEVICE_NAME}' not found.[/yellow]")
-            return
+            return False
 
         if CHANGE_SYSTEM_VOLUME:
             set_system_volume(SYSTEM_VOLUME_PERCENT)
 
-        playback = safe_sp_call(sp.current_playback)
+        if prefetched:
+            is_playing = prefetched.is_playing
+        else:
+            playback = safe_sp_call(sp.current_playback)
+            is_playing = bool(playback and playback.get("is_playing"))
 
-        if playback and playback.get("is_playing"):
-            return
+        if is_playing:
+            return True
 
         try:
-            safe_sp_call(sp.start_playback, device_id=device_id)
+            device_id = start_playback_on(device_id)
             console.log("[green]Resumed previous playback.[/green]")
 
         except spotipy.exceptions.SpotifyException as e:
@@ -420,10 +2297,8 @@ def resume_spotify():
                 console.log("[blue]No resume context. Attempting DJ...[/blue]")
 
                 try:
-                    safe_sp_call(
-                        sp.start_playback,
-                        device_id=device_id,
-                        context_uri=FALLBACK_DJ_URI,
+                    device_id = start_playback_on(
+                        device_id, context_uri=FALLBACK_DJ_URI
                     )
                     console.log("[green]Started Spotify DJ.[/green]")
 
@@ -432,10 +2307,8 @@ def resume_spotify():
                         "[yellow]DJ unavailable. Starting fallback playlist.[/yellow]"
                     )
 
-                    safe_sp_call(
-                        sp.start_playback,
-                        device_id=device_id,
-                        context_uri=FALLBACK_PLAYLIST_URI,
+                    device_id = start_playback_on(
+                        device_id, context_uri=FALLBACK_PLAYLIST_URI
                     )
                     console.log("[green]Started fallback playlist.[/green]")
             else:
@@ -444,8 +2317,11 @@ def resume_spotify():
         if CHANGE_SPOTIFY_VOLUME:
             set_spotify_volume(device_id)
 
+        return True
+
     except Exception as e:
         console.log(f"[red]Playback error:[/red] {e}")
+        return False
 
 
 # ==========================================================
@@ -453,113 +2329,638 @@ def resume_spotify():
 # ==========================================================
 
 
-def monitor_loop():
-    global last_sound_time, countdown_text, current_icon_state
-    global non_spotify_sound_detected, non_spotify_active_start_time
+class PollScheduler:
+    # Sleeps until monotonic deadlines so the poll period doesn't drift by the
+    # time each tick takes. wake() cuts the current sleep short.
+
+    def __init__(self):
+        self._deadline = time.monotonic()
+        self._wake_event = threading.Event()
+
+    def wake(self):
+        self._wake_event.set()
+
+    def wait(self, interval):
+        now = time.monotonic()
+        self._deadline += interval
+        if self._deadline < now:
+            # The tick overran (or the machine slept); don't try to catch up,
+            # and still leave a full interval before the next tick
+            self._deadline = now + interval
+
+        if self._wake_event.wait(self._deadline - now):
+            self._wake_event.clear()
+            self._deadline = time.monotonic()
+
+
+scheduler = PollScheduler()
+
+
+class ResumeWorker:
+    # Runs resumes on a dedicated thread so slow or retried Spotify calls
+    # never stall sampling. It has a single slot: a request made while a
+    # resume is already in flight is dropped.
+
+    def __init__(self, func):
+        self._func = func
+        self._lock = threading.Lock()
+        self._requested = threading.Event()
+        self._busy = False
+        # None until a resume has finished; cleared once Spotify is heard again
+        self.last_result = None
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    @property
+    def busy(self):
+        with self._lock:
+            return self._busy
+
+    def submit(self):
+        with self._lock:
+            if self._busy:
+                return False
+            self._busy = True
+        self._requested.set()
+        return True
+
+    def clear_result(self):
+        with self._lock:
+            self.last_result = None
+
+    def _run(self):
+        # set_system_volume() talks to the audio backend from this thread
+        session_registry.backend.init_thread()
+        profiler.register_thread("resume")
+
+        while True:
+            self._requested.wait()
+            self._requested.clear()
+            try:
+                with resume_seconds.time():
+                    result = self._func()
+            except Exception as e:
+                console.log(f"[red]Resume worker error:[/red] {e}")
+                result = False
+            resumes_total.inc("success" if result else "failure")
+
+            with self._lock:
+                self.last_result = result
+                self._busy = False
+            # Let the monitor loop report the outcome straight away
+            scheduler.wake()
+
+
+resume_worker = ResumeWorker(resume_spotify)
+
+
+ACTION_ARMED = "armed"
+ACTION_WARM_UP = "warm_up"
+ACTION_PREFETCH = "prefetch"
+ACTION_RESUME = "resume"
+ACTION_CLEAR_RESUME_RESULT = "clear_resume_result"
+
+
+class MonitorConfig:
+    __slots__ = (
+        "silence_timeout",
+        "min_activation_duration",
+        "require_non_spotify_sound",
+        "polling_interval",
+    )
 
-    pythoncom.CoInitialize()
+    def __init__(
+        self,
+        silence_timeout,
+        min_activation_duration,
+        require_non_spotify_sound,
+        polling_interval,
+    ):
+        self.silence_timeout = silence_timeout
+        self.min_activation_duration = min_activation_duration
+        self.require_non_spotify_sound = require_non_spotify_sound
+        self.polling_interval = polling_interval
 
-    while running:
-        try:
-            with paused_lock:
-                is_paused = paused
-
-            new_icon_state = "active"
-            if is_paused:
-                new_text = "Paused"
-                new_icon_state = "paused"
-                # Reset state so it doesn't immediately resume upon unpausing
-                last_sound_time = time.time()
-                non_spotify_sound_detected = False
-                non_spotify_active_start_time = 0.0
+
+def current_monitor_config():
+    with timeout_lock:
+        timeout_value = SILENCE_TIMEOUT
+    return MonitorConfig(
+        timeout_value,
+        MIN_ACTIVATION_DURATION,
+        REQUIRE_NON_SPOTIFY_SOUND,
+        POLLING_INTERVAL,
+    )
+
+
+class MonitorDecision:
+    __slots__ = ("text", "icon_state", "icon_badge", "poll_interval", "actions")
+
+    def __init__(self, text, icon_state, icon_badge, poll_interval, actions):
+        self.text = text
+        self.icon_state = icon_state
+        self.icon_badge = icon_badge
+        self.poll_interval = poll_interval
+        self.actions = actions
+
+
+class MonitorState:
+    # The arming/countdown/resume logic as a pure state machine. transition()
+    # never reads the clock, audio or Spotify: everything comes in as
+    # arguments and side effects go out as actions, so any clock works and a
+    # day of samples can be replayed in milliseconds.
+
+    __slots__ = ("last_sound_time", "armed", "activity_start")
+
+    def __init__(self, last_sound_time, armed=False, activity_start=None):
+        self.last_sound_time = last_sound_time
+        # Whether non-Spotify sound has played long enough to arm auto-resume
+        self.armed = armed
+        # When the current stretch of non-Spotify sound started, if any
+        self.activity_start = activity_start
+
+    def transition(
+        self,
+        now,
+        spotify_playing,
+        others_playing,
+        config,
+        paused=False,
+        spotify_reachable=True,
+        resume_status=None,
+        blocking_playing=False,
+    ):
+        # resume_status is None, "busy" or "failed". blocking_playing means a
+        # never-resume app is audible. Returns the new state and a
+        # MonitorDecision.
+        if paused:
+            # Reset state so it doesn't immediately resume upon unpausing
+            return MonitorState(now), MonitorDecision(
+                "Paused",
+                "paused",
+                None,
+                config.polling_interval * PAUSED_POLLING_FACTOR,
+                [],
+            )
+
+        last_sound_time = self.last_sound_time
+        armed = self.armed
+        activity_start = self.activity_start
+        actions = []
+        text = ""
+        icon_state = "active"
+        icon_badge = None
+        poll_interval = config.polling_interval
+
+        if others_playing:
+            last_sound_time = now
+            if activity_start is None:
+                activity_start = now
+
+            if now - activity_start >= config.min_activation_duration:
+                if not armed and config.require_non_spotify_sound:
+                    actions.append(ACTION_ARMED)
+                armed = True
+
+            text = "Other sound playing..."
+
+        if spotify_playing:
+            last_sound_time = now
+            # If only Spotify is playing, we reset the arming state
+            armed = False
+            activity_start = None
+            actions.append(ACTION_CLEAR_RESUME_RESULT)
+            if resume_status == "failed":
+                resume_status = None
+            text = "Spotify playing"
+        elif others_playing:
+            if config.require_non_spotify_sound:
+                icon_state = "armed" if armed else "unarmed"
             else:
-                spotify_playing, others_playing = get_audio_state()
-
-                if others_playing:
-                    last_sound_time = time.time()
-                    if non_spotify_active_start_time == 0.0:
-                        non_spotify_active_start_time = time.time()
-
-                    duration = time.time() - non_spotify_active_start_time
-                    if duration >= MIN_ACTIVATION_DURATION:
-                        if not non_spotify_sound_detected and REQUIRE_NON_SPOTIFY_SOUND:
-                            msg = (
-                                f"Non-Spotify sound detected (>{MIN_ACTIVATION_DURATION}s). "
-                                "Auto-resume armed."
-                            )
-                            console.log(f"[blue]{msg}[/blue]")
-                        non_spotify_sound_detected = True
-
-                    new_text = "Other sound playing..."
-
-                if spotify_playing:
-                    last_sound_time = time.time()
-                    # If only Spotify is playing, we reset the arming state
-                    non_spotify_sound_detected = False
-                    non_spotify_active_start_time = 0.0
-                    new_text = "Spotify playing"
-                    new_icon_state = "active"
-                elif others_playing:
-                    # new_text is already set above
-                    if REQUIRE_NON_SPOTIFY_SOUND:
-                        new_icon_state = (
-                            "armed" if non_spotify_sound_detected else "unarmed"
-                        )
-                    else:
-                        new_icon_state = "armed"
+                icon_state = "armed"
+        elif blocking_playing:
+            # Holds the countdown at its full length, but doesn't arm it
+            last_sound_time = now
+            activity_start = None
+            text = "Resume on hold..."
+            if config.require_non_spotify_sound and not armed:
+                icon_state = "unarmed"
+            else:
+                icon_state = "armed"
+        else:
+            # Silence
+            activity_start = None
+
+            if not config.require_non_spotify_sound or armed:
+                remaining_time = config.silence_timeout - (now - last_sound_time)
+
+                if remaining_time > 0:
+                    text = f"Resuming in {int(remaining_time)}s"
+                    icon_state = "armed"
+                    icon_badge = int(remaining_time)
+                    if spotify_reachable:
+                        if remaining_time <= CONNECTION_WARMUP_LEAD:
+                            actions.append(ACTION_WARM_UP)
+                        if remaining_time <= PREFETCH_LEAD:
+                            actions.append(ACTION_PREFETCH)
+                    # Wake up right at the deadline rather than up to a full
+                    # interval late
+                    poll_interval = max(
+                        MIN_POLLING_INTERVAL,
+                        min(config.polling_interval, remaining_time),
+                    )
+                elif not spotify_reachable:
+                    # Stay armed and resume once Spotify is reachable instead
+                    # of burning an attempt that can't succeed
+                    text = "Waiting for Spotify..."
+                    icon_state = "armed"
                 else:
-                    # Silence
-                    non_spotify_active_start_time = 0.0
-
-                    if not REQUIRE_NON_SPOTIFY_SOUND or non_spotify_sound_detected:
-                        with timeout_lock:
-                            timeout_value = SILENCE_TIMEOUT
-
-                        remaining_time = timeout_value - (time.time() - last_sound_time)
-
-                        if remaining_time > 0:
-                            new_text = f"Resuming in {int(remaining_time)}s"
-                            new_icon_state = "armed"
-                        else:
-                            new_text = "Resuming now..."
-                            resume_spotify()
-                            last_sound_time = time.time()
-                            non_spotify_sound_detected = False
-                            new_icon_state = "active"
-                    else:
-                        new_text = "Idle"
-                        last_sound_time = time.time()
-                        new_icon_state = "unarmed"
-
-                if REQUIRE_NON_SPOTIFY_SOUND:
-                    status = "Armed" if non_spotify_sound_detected else "Not Armed"
-                    new_text = f"{new_text} ({status})"
-
-            if new_icon_state != current_icon_state:
-                current_icon_state = new_icon_state
-                if tray_icon:
-                    if new_icon_state == "active":
-                        tray_icon.icon = ICON_ACTIVE
-                    elif new_icon_state == "paused":
-                        tray_icon.icon = ICON_PAUSED
-                    elif new_icon_state == "unarmed":
-                        tray_icon.icon = ICON_UNARMED
-                    elif new_icon_state == "armed":
-                        tray_icon.icon = ICON_ARMED
-
-            if new_text != countdown_text:
-                countdown_text = new_text
-                if tray_icon:
-                    tray_icon.title = f"NoSilence - {countdown_text}"
-                    # Only update the menu if it's not currently open to avoid
-                    # breaking it
-                    if not is_menu_open():
-                        tray_icon.update_menu()
+                    text = "Resuming now..."
+                    actions.append(ACTION_RESUME)
+                    last_sound_time = now
+                    armed = False
+            else:
+                text = "Idle"
+                last_sound_time = now
+                icon_state = "unarmed"
+                poll_interval = config.polling_interval * IDLE_POLLING_FACTOR
+
+        if resume_status == "busy":
+            text = "Resume in progress..."
+        elif resume_status == "failed":
+            text = f"{text} - Resume failed"
+
+        if config.require_non_spotify_sound:
+            status = "Armed" if armed else "Not Armed"
+            text = f"{text} ({status})"
+
+        return MonitorState(last_sound_time, armed, activity_start), MonitorDecision(
+            text, icon_state, icon_badge, poll_interval, actions
+        )
+
+
+def simulate_monitor(samples, config, state=None):
+    # Feeds (now, spotify_playing, others_playing, blocking_playing) samples
+    # through the state machine and yields (now, decision) pairs, with no real
+    # time passing
+    for now, spotify_playing, others_playing, blocking_playing in samples:
+        if state is None:
+            state = MonitorState(now)
+        state, decision = state.transition(
+            now,
+            spotify_playing,
+            others_playing,
+            config,
+            blocking_playing=blocking_playing,
+        )
+        yield now, decision
+
+
+def run_monitor_actions(actions, config):
+    for action in actions:
+        if action == ACTION_ARMED:
+            msg = (
+                f"Non-Spotify sound detected (>{config.min_activation_duration}s). "
+                "Auto-resume armed."
+            )
+            console.log(f"[blue]{msg}[/blue]")
+        elif action == ACTION_WARM_UP:
+            http_pool.warm_async()
+        elif action == ACTION_PREFETCH:
+            resume_prefetcher.start()
+        elif action == ACTION_RESUME:
+            if not resume_worker.submit():
+                console.log("[blue]Resume already in progress.[/blue]")
+        elif action == ACTION_CLEAR_RESUME_RESULT:
+            resume_worker.clear_result()
+
+
+def get_resume_status():
+    if resume_worker.busy:
+        return "busy"
+    if resume_worker.last_result is False:
+        return "failed"
+    return None
+
+
+def monitor_tick(clock=time.monotonic):
+    # One pass of the monitor loop; returns how long to wait before the next
+    global monitor_state, countdown_text, current_icon_frame
+    global spotify_connection_state, menu_was_open
+
+    with paused_lock:
+        is_paused = paused
+
+    config = current_monitor_config()
+    if is_paused:
+        spotify_playing = others_playing = blocking_playing = False
+    else:
+        spotify_playing, others_playing, blocking_playing = get_audio_state()
+
+    monitor_state, decision = monitor_state.transition(
+        clock(),
+        spotify_playing,
+        others_playing,
+        config,
+        paused=is_paused,
+        spotify_reachable=spotify_connector.ready and circuit_breaker.allows_calls(),
+        resume_status=get_resume_status(),
+        blocking_playing=blocking_playing,
+    )
+    run_monitor_actions(decision.actions, config)
+
+    # Only swap the icon when the visible frame actually changes
+    badge = None
+    if decision.icon_badge is not None:
+        badge = format_badge(decision.icon_badge)
+    new_icon_frame = (decision.icon_state, badge)
+    if new_icon_frame != current_icon_frame:
+        current_icon_frame = new_icon_frame
+        if tray_icon:
+            tray_icon.icon = render_icon(decision.icon_state, badge, icon_size)
+
+    menu_open = is_menu_open()
+    if menu_open and not menu_was_open:
+        # Fetch a fresh device list while the user looks at the menu;
+        # it's shown the next time the menu is rebuilt
+        device_cache.refresh_if_older(DEVICE_MENU_REFRESH_MIN_AGE)
+    menu_was_open = menu_open
+
+    spotify_connection_state = circuit_breaker.state
+    text = decision.text
+    if spotify_connector.state == SpotifyConnector.CONNECTING:
+        text = f"{text} - Connecting to Spotify..."
+    elif spotify_connector.state == SpotifyConnector.FAILED:
+        text = f"{text} - Not signed in to Spotify"
+    if text != countdown_text:
+        countdown_text = text
+        # The tooltip is cheap to set, so it tracks every change
+        if tray_icon:
+            tray_icon.title = f"NoSilence - {countdown_text}"
+
+    if tray_icon:
+        menu_updater.refresh(tray_icon, menu_open)
+    ipc_server.publish_status()
+
+    return decision.poll_interval
+
+
+def monitor_loop(clock=time.monotonic):
+    global monitor_state
+
+    session_registry.backend.init_thread()
+    profiler.register_thread("monitor")
+    session_registry.start()
+    monitor_state = MonitorState(clock())
 
+    while running:
+        try:
+            with poll_tick_seconds.time():
+                poll_interval = monitor_tick(clock)
         except Exception as e:
             console.log(f"[red]Monitor error:[/red] {e}")
+            poll_interval = POLLING_INTERVAL
+
+        scheduler.wait(poll_interval)
+
+
+# ==========================================================
+# AUDIO TRACES
+# ==========================================================
 
-        time.sleep(POLLING_INTERVAL)
+# File layout: TRACE_MAGIC, then a stream of records. A name record
+# ("N", uint16 length, utf-8) interns a process name; names are numbered in
+# the order they appear. A tick record ("T", float64 timestamp, uint16 count)
+# is followed by count uint16 name indexes and count float32 peaks. All
+# little-endian.
+TRACE_MAGIC = b"NSTRACE1"
+TRACE_NAME = b"N"
+TRACE_TICK = b"T"
+TRACE_TAG = struct.Struct("<c")
+TRACE_NAME_HEADER = struct.Struct("<H")
+TRACE_TICK_HEADER = struct.Struct("<dH")
+
+
+def to_little_endian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+class TraceRecorder:
+    # Append-only binary log of every audio sample, for reproducing
+    # misfires offline with replay_trace()
+
+    def __init__(self, path, max_bytes=TRACE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._names = {}
+        self._size = 0
+        self._failed = False
+
+    def _open(self):
+        self._names = {}
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            if data.startswith(TRACE_MAGIC):
+                # Keep appending to an existing trace; relearn its name table
+                # and cut off whatever a crash left after the last complete
+                # record, so new records don't follow torn bytes
+                complete = len(TRACE_MAGIC)
+                try:
+                    for kind, value, end in parse_trace_records(data):
+                        if kind == TRACE_NAME:
+                            self._names[value] = len(self._names)
+                        complete = end
+                except ValueError:
+                    pass
+                self._file = open(self.path, "ab")
+                if complete < len(data):
+                    console.log(
+                        f"[yellow]Dropped {len(data) - complete} bytes of torn "
+                        "trace data.[/yellow]"
+                    )
+                    self._file.truncate(complete)
+                self._size = complete
+                return self._file
+            console.log("[yellow]Existing trace unreadable, rotating it.[/yellow]")
+            os.replace(self.path, self.path + ".1")
+
+        self._file = open(self.path, "wb")
+        self._file.write(TRACE_MAGIC)
+        self._size = len(TRACE_MAGIC)
+        return self._file
+
+    def _rotate(self):
+        self.close_locked()
+        os.replace(self.path, self.path + ".1")
+        self._open()
+
+    def record(self, timestamp, readings):
+        with self._lock:
+            if self._failed:
+                return
+            try:
+                file = self._file
+                if file is None:
+                    file = self._open()
+
+                chunks = []
+                indexes = array("H")
+                peaks = array("f")
+                for name, peak, *_ in readings:
+                    index = self._names.get(name)
+                    if index is None:
+                        index = self._names[name] = len(self._names)
+                        encoded = name.encode("utf-8")
+                        chunks.append(TRACE_NAME + TRACE_NAME_HEADER.pack(len(encoded)))
+                        chunks.append(encoded)
+                    indexes.append(index)
+                    peaks.append(peak)
+
+                chunks.append(
+                    TRACE_TICK + TRACE_TICK_HEADER.pack(timestamp, len(indexes))
+                )
+                chunks.append(to_little_endian(indexes))
+                chunks.append(to_little_endian(peaks))
+                data = b"".join(chunks)
+                file.write(data)
+                self._size += len(data)
+
+                if self._size >= self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                console.log(f"[red]Trace recording stopped:[/red] {e}")
+                self._failed = True
+                self.close_locked()
+
+    def close_locked(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self.close_locked()
+
+
+trace_recorder = None
+
+
+def iter_trace_records(path):
+    # Yields ("N", name) and ("T", (timestamp, indexes, peaks)) records. A
+    # record cut short by a crash ends the trace quietly.
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(TRACE_MAGIC):
+        raise ValueError(f"{path} is not a NoSilence trace")
+
+    for kind, value, _ in parse_trace_records(data):
+        yield kind.decode("ascii"), value
+
+
+def parse_trace_records(data):
+    # Yields (tag, value, offset just past the record) for each complete
+    # record after the magic
+    pos = len(TRACE_MAGIC)
+    end = len(data)
+    while pos < end:
+        (tag,) = TRACE_TAG.unpack_from(data, pos)
+        pos += TRACE_TAG.size
+        if tag == TRACE_NAME:
+            if pos + TRACE_NAME_HEADER.size > end:
+                return
+            (length,) = TRACE_NAME_HEADER.unpack_from(data, pos)
+            pos += TRACE_NAME_HEADER.size
+            stop = pos + length
+            if stop > end:
+                return
+            yield tag, data[pos:stop].decode("utf-8"), stop
+            pos = stop
+        elif tag == TRACE_TICK:
+            if pos + TRACE_TICK_HEADER.size > end:
+                return
+            timestamp, count = TRACE_TICK_HEADER.unpack_from(data, pos)
+            pos += TRACE_TICK_HEADER.size
+            split = pos + count * 2
+            stop = split + count * 4
+            if stop > end:
+                return
+            indexes = array("H", data[pos:split])
+            peaks = array("f", data[split:stop])
+            pos = stop
+            if sys.byteorder == "big":
+                indexes.byteswap()
+                peaks.byteswap()
+            yield tag, (timestamp, indexes, peaks), pos
+        else:
+            raise ValueError(f"Corrupt trace record at byte {pos - 1}")
+
+
+def read_trace(path):
+    # Yields (timestamp, [(process_name, peak), ...]) for every recorded tick
+    names = []
+    for kind, value in iter_trace_records(path):
+        if kind == "N":
+            names.append(value)
+        else:
+            timestamp, indexes, peaks = value
+            yield timestamp, [(names[i], peaks[n]) for n, i in enumerate(indexes)]
+
+
+def replay_trace(path, config, threshold):
+    # Runs a recorded trace through the decision logic as fast as possible.
+    # Traces only hold process names, so path and display name rules can't
+    # apply here.
+    kinds: dict[str, tuple[str, Optional[float]]] = {}
+
+    def samples():
+        for timestamp, readings in read_trace(path):
+            classified = []
+            for name, peak in readings:
+                kind = kinds.get(name)
+                if kind is None:
+                    kind = kinds[name] = audio_rules.classify(name)
+                classified.append((name, peak, *kind))
+            yield (timestamp, *classify_readings(classified, threshold))
+
+    ticks = 0
+    first = last = None
+    armed_at = []
+    resumed_at = []
+    try:
+        for now, decision in simulate_monitor(samples(), config):
+            ticks += 1
+            if first is None:
+                first = now
+            last = now
+            if ACTION_ARMED in decision.actions:
+                armed_at.append(now)
+            if ACTION_RESUME in decision.actions:
+                resumed_at.append(now)
+    except ValueError as e:
+        # Report what could be read rather than losing it to a traceback
+        console.print(f"[red]Trace unreadable past this point:[/red] {e}")
+
+    console.print(f"[bold]Replayed {ticks} ticks from {path}[/bold]")
+    if first is not None and last is not None:
+        console.print(
+            f"{datetime.fromtimestamp(first):%Y-%m-%d %H:%M:%S} to "
+            f"{datetime.fromtimestamp(last):%Y-%m-%d %H:%M:%S}"
+        )
+    console.print(
+        f"Threshold {threshold * 100:.1f}%, timeout {config.silence_timeout}s, "
+        f"activation {config.min_activation_duration}s"
+    )
+    console.print(f"Armed {len(armed_at)} times, resumed {len(resumed_at)} times")
+    for timestamp in resumed_at:
+        console.print(f"  Resume at {datetime.fromtimestamp(timestamp):%H:%M:%S}")
+    return resumed_at
 
 
 # ==========================================================
@@ -576,8 +2977,9 @@ def set_timeout(seconds):
 
 
 def set_custom_timeout(icon, item):
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     custom_timeout = simpledialog.askinteger(
         "Custom Silence Timeout",
         "Enter silence timeout in seconds:",
@@ -598,8 +3000,9 @@ def set_activation_duration(seconds):
 
 
 def set_custom_activation_duration(icon, item):
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     custom_duration = simpledialog.askinteger(
         "Custom Activation Duration",
         "Enter minimum activation duration in seconds:",
@@ -646,7 +3049,7 @@ def create_activation_duration_menu():
         menu_items.append(item("Other...", set_custom_activation_duration))
         return menu_items
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def create_timeout_menu():
@@ -682,19 +3085,21 @@ def create_timeout_menu():
         menu_items.append(item("Other...", set_custom_timeout))
         return menu_items
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def set_polling_interval(seconds):
     global POLLING_INTERVAL
     POLLING_INTERVAL = seconds
     save_config()
+    scheduler.wake()
     console.log(f"Polling interval set to [cyan]{seconds}[/cyan] seconds")
 
 
 def set_custom_polling_interval(icon, item):
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     custom_interval = simpledialog.askfloat(
         "Custom Polling Interval",
         "Enter polling interval in seconds:",
@@ -741,7 +3146,7 @@ def create_polling_interval_menu():
         menu_items.append(item("Other...", set_custom_polling_interval))
         return menu_items
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def set_threshold(threshold):
@@ -753,8 +3158,9 @@ def set_threshold(threshold):
 
 
 def set_custom_threshold(icon, item):
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     custom_threshold = simpledialog.askfloat(
         "Custom Silence Threshold",
         "Enter silence threshold (e.g., 0.001 to 1.0):",
@@ -805,7 +3211,7 @@ def create_threshold_menu():
         menu_items.append(item("Other...", set_custom_threshold))
         return menu_items
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def set_spotify_volume_config(percent):
@@ -816,8 +3222,9 @@ def set_spotify_volume_config(percent):
 
 
 def set_custom_spotify_volume(icon, item):
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     custom_volume = simpledialog.askinteger(
         "Custom Spotify Volume",
         "Enter Spotify volume percentage (0-100):",
@@ -864,7 +3271,7 @@ def create_spotify_volume_menu():
         menu_items.append(item("Other...", set_custom_spotify_volume))
         return menu_items
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def set_system_volume_config(percent):
@@ -875,8 +3282,9 @@ def set_system_volume_config(percent):
 
 
 def set_custom_system_volume(icon, item):
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
+    from tkinter import simpledialog
+
+    root = hidden_tk_root()
     custom_volume = simpledialog.askinteger(
         "Custom System Volume",
         "Enter system volume percentage (0-100):",
@@ -923,7 +3331,7 @@ def create_system_volume_menu():
         menu_items.append(item("Other...", set_custom_system_volume))
         return menu_items
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def set_device(device_name):
@@ -934,61 +3342,95 @@ def set_device(device_name):
 
 
 def create_device_menu():
+    # Items are only rebuilt when the device list or its staleness changes
+    cached: dict[str, Any] = {"key": None, "items": []}
+
     def get_items():
+        available_devices, age = device_cache.snapshot()
+        stale = age >= device_cache.ttl
+        if stale:
+            device_cache.refresh_async()
+
+        key = (device_cache.version, stale, device_cache.last_error is None)
+        if key != cached["key"]:
+            cached["key"] = key
+            cached["items"] = build_items(available_devices, stale)
+        return cached["items"]
+
+    def build_items(available_devices, stale):
         global SPOTIFY_DEVICE_NAME
         menu_items = []
-        try:
-            devices = safe_sp_call(sp.devices)
-            if not devices:
-                raise RuntimeError("Could not fetch devices.")
 
-            available_devices = devices.get("devices", [])
+        if available_devices is None:
+            if device_cache.last_error is not None:
+                menu_items.append(item("Error fetching devices", None, enabled=False))
+            else:
+                menu_items.append(item("Loading devices...", None, enabled=False))
+            return menu_items
 
-            if not SPOTIFY_DEVICE_NAME and available_devices:
-                SPOTIFY_DEVICE_NAME = available_devices[0]["name"]
-                save_config()
-                console.log(
-                    f"Defaulting Spotify device to [cyan]{SPOTIFY_DEVICE_NAME}[/cyan]"
-                )
+        if not SPOTIFY_DEVICE_NAME and available_devices:
+            SPOTIFY_DEVICE_NAME = available_devices[0]["name"]
+            save_config()
+            console.log(
+                f"Defaulting Spotify device to [cyan]{SPOTIFY_DEVICE_NAME}[/cyan]"
+            )
+
+        if not available_devices:
+            menu_items.append(item("No devices found", None, enabled=False))
 
-            for device in available_devices:
-                device_name = device.get("name")
+        for device in available_devices:
+            device_name = device.get("name")
+            label = f"{device_name} (stale)" if stale else device_name
 
-                def make_action(d):
-                    def action(icon, item):
-                        set_device(d)
+            def make_action(d):
+                def action(icon, item):
+                    set_device(d)
 
-                    return action
+                return action
 
-                def make_checked(d):
-                    def checked(item):
-                        return SPOTIFY_DEVICE_NAME == d
+            def make_checked(d):
+                def checked(item):
+                    return SPOTIFY_DEVICE_NAME == d
 
-                    return checked
+                return checked
 
-                menu_items.append(
-                    item(
-                        device_name,
-                        make_action(device_name),
-                        checked=make_checked(device_name),
-                        radio=True,
-                    )
+            menu_items.append(
+                item(
+                    label,
+                    make_action(device_name),
+                    checked=make_checked(device_name),
+                    radio=True,
                 )
-        except (RuntimeError, Exception) as e:
-            console.log(f"[red]Failed to fetch devices:[/red] {e}")
-            menu_items.append(item("Error fetching devices", None, enabled=False))
+            )
         return menu_items
 
     return pystray.Menu(get_items)
 
 
-def toggle_pause(icon, item):
+def set_paused(value):
     global paused
     with paused_lock:
-        paused = not paused
+        paused = value
+    scheduler.wake()
     console.log(f"Program [cyan]{'paused' if paused else 'resumed'}[/cyan]")
 
 
+def toggle_pause(icon, item):
+    set_paused(not paused)
+
+
+def retry_spotify_sign_in(icon, item):
+    spotify_connector.retry()
+
+
+def toggle_profiling(icon, item):
+    # stop() writes a final dump, so keep it off the tray thread
+    if profiler.running:
+        threading.Thread(target=profiler.stop, daemon=True).start()
+    else:
+        profiler.start()
+
+
 def toggle_require_non_spotify_sound(icon, item):
     global REQUIRE_NON_SPOTIFY_SOUND
     REQUIRE_NON_SPOTIFY_SOUND = not REQUIRE_NON_SPOTIFY_SOUND
@@ -1013,10 +3455,87 @@ def toggle_change_system_volume(icon, item):
     console.log(f"System volume control [cyan]{status}[/cyan]")
 
 
+def menu_state():
+    # Everything the tray menu displays; the menu is only rebuilt when this
+    # changes
+    _, device_list_age = device_cache.snapshot()
+    return (
+        countdown_text,
+        paused,
+        spotify_connection_state,
+        spotify_connector.state,
+        device_cache.version,
+        device_list_age >= device_cache.ttl,
+        # A failed fetch changes what the Devices submenu shows too
+        device_cache.last_error is None,
+        SPOTIFY_DEVICE_NAME,
+        SILENCE_TIMEOUT,
+        MIN_ACTIVATION_DURATION,
+        POLLING_INTERVAL,
+        SILENCE_THRESHOLD,
+        SPOTIFY_VOLUME_PERCENT,
+        SYSTEM_VOLUME_PERCENT,
+        REQUIRE_NON_SPOTIFY_SOUND,
+        CHANGE_SPOTIFY_VOLUME,
+        CHANGE_SYSTEM_VOLUME,
+        profiler.running,
+    )
+
+
+class TrayMenuUpdater:
+    # Coalesces menu rebuilds: the native menu is regenerated only when
+    # something it shows has changed, at most once per
+    # MENU_UPDATE_MIN_INTERVAL, and never while it's open (that would break it).
+
+    def __init__(self, min_interval=MENU_UPDATE_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._rendered = None
+        self._last_update = None
+
+    def refresh(self, icon, menu_open):
+        if menu_open:
+            return
+
+        state = menu_state()
+        if state == self._rendered:
+            return
+
+        now = time.monotonic()
+        if (
+            self._last_update is not None
+            and now - self._last_update < self.min_interval
+        ):
+            return
+
+        self._rendered = state
+        self._last_update = now
+        icon.update_menu()
+
+
+menu_updater = TrayMenuUpdater()
+
+
+def describe_spotify_connection():
+    if spotify_connector.state == SpotifyConnector.CONNECTING:
+        return "Connecting..."
+    if spotify_connector.state == SpotifyConnector.FAILED:
+        return "Sign-in failed (click to retry)"
+    if spotify_connection_state == CircuitBreaker.OPEN:
+        return "Unreachable"
+    if spotify_connection_state == CircuitBreaker.HALF_OPEN:
+        return "Reconnecting..."
+    return "Connected"
+
+
 def create_menu(icon=None):
     def get_items():
         return [
             item(lambda item_obj: countdown_text, None, enabled=False),
+            item(
+                lambda i: f"Spotify: {describe_spotify_connection()}",
+                retry_spotify_sign_in,
+                enabled=lambda i: spotify_connector.state == SpotifyConnector.FAILED,
+            ),
             pystray.Menu.SEPARATOR,
             item(
                 lambda i: "Resume Program" if paused else "Pause Program",
@@ -1046,22 +3565,42 @@ def create_menu(icon=None):
             item("Spotify Volume", create_spotify_volume_menu()),
             item("System Volume", create_system_volume_menu()),
             pystray.Menu.SEPARATOR,
+            item(
+                "Profiling",
+                toggle_profiling,
+                checked=lambda i: profiler.running,
+                visible=profiler.menu_visible,
+            ),
             item(f"Version: {VERSION}", None, enabled=False),
             item("Quit", on_exit),
         ]
 
-    return pystray.Menu(get_items)
+    return pystray.Menu(*get_items())
 
 
 def setup_tray():
-    icon = pystray.Icon("NoSilence", ICON_ACTIVE, "NoSilence")
+    global icon_size
+    icon_size = get_icon_size()
+    icon = pystray.Icon(
+        "NoSilence", render_icon("active", None, icon_size), "NoSilence"
+    )
     icon.menu = create_menu(icon)
     return icon
 
 
-def on_exit(icon, item):
+def shutdown():
     global running
     running = False
+    scheduler.wake()
+    config_persistence.flush()
+    profiler.stop()
+    ipc_server.close()
+    if trace_recorder is not None:
+        trace_recorder.close()
+
+
+def on_exit(icon, item):
+    shutdown()
     icon.stop()
 
 
@@ -1069,20 +3608,472 @@ def on_exit(icon, item):
 # SPOTIFY AUTH CHECK
 # ==========================================================
 def check_spotify_auth():
-    try:
-        user = safe_sp_call(sp.current_user)
-        if user:
-            console.log(
-                f"[bold green]Authenticated as {user['display_name']}[/bold green]"
-            )
+    user = safe_sp_call(sp.current_user)
+    if not user:
+        raise SpotifyAuthError("Could not authenticate.")
+    console.log(f"[bold green]Authenticated as {user['display_name']}[/bold green]")
+
+
+def is_fatal_auth_error(e):
+    # Retrying can't fix a cancelled sign-in or credentials Spotify rejects
+    if isinstance(e, SpotifyAuthError):
+        return True
+    if spotipy is not None and isinstance(e, spotipy.oauth2.SpotifyOauthError):
+        return True
+    return classify_spotify_error(e) == "client"
+
+
+class TokenRefresher:
+    # spotipy only refreshes the access token inside the first call that
+    # finds it expired, which is often the device lookup at the start of a
+    # resume. This refreshes it in the background TOKEN_REFRESH_LEAD seconds
+    # early instead, going by expires_at in the token cache. The cache is
+    # re-read every TOKEN_CHECK_INTERVAL, which picks up refreshes made
+    # elsewhere and copes with the machine sleeping through a deadline.
+
+    def __init__(self, lead=TOKEN_REFRESH_LEAD, check_interval=TOKEN_CHECK_INTERVAL):
+        self.lead = lead
+        self.check_interval = check_interval
+        self._auth_manager: Any = None
+        self._thread = None
+        self._wake = threading.Event()
+
+    def start(self, auth_manager):
+        self._auth_manager = auth_manager
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
         else:
-            raise RuntimeError("Could not authenticate.")
-    except (spotipy.exceptions.SpotifyException, RuntimeError) as e:
-        console.log(f"[red]Spotify authentication failed:[/red] {e}")
-        sys.exit(1)
-    except Exception as e:
-        console.log(f"[red]Unexpected error during Spotify auth:[/red] {e}")
-        sys.exit(1)
+            self._wake.set()
+
+    def seconds_until_refresh(self):
+        token_info = self._auth_manager.cache_handler.get_cached_token()
+        if not token_info or "expires_at" not in token_info:
+            return None
+        return token_info["expires_at"] - self.lead - time.time()
+
+    def refresh(self):
+        token_info = self._auth_manager.cache_handler.get_cached_token()
+        self._auth_manager.refresh_access_token(token_info["refresh_token"])
+
+    def _run(self):
+        failures = 0
+        while running:
+            try:
+                delay = self.seconds_until_refresh()
+            except Exception:
+                delay = None
+
+            if delay is None or delay > 0:
+                wait = self.check_interval if delay is None else delay
+                self._wake.wait(min(wait, self.check_interval))
+                self._wake.clear()
+                continue
+
+            try:
+                self.refresh()
+            except Exception as e:
+                failures += 1
+                backoff = min(self.check_interval, 2**failures)
+                console.log(
+                    f"[yellow]Spotify token refresh failed:[/yellow] {e}. "
+                    f"Retrying in {backoff}s."
+                )
+                self._wake.wait(backoff)
+                self._wake.clear()
+            else:
+                failures = 0
+
+
+token_refresher = TokenRefresher()
+
+
+class SpotifyConnector:
+    # Signs in to Spotify in the background so the tray and audio monitoring
+    # start straight away. Network trouble is retried with exponential backoff
+    # and jitter; a cancelled or rejected sign-in stops until retry() is
+    # called from the tray or the reconnect IPC method. Until it's ready the
+    # monitor treats Spotify as unreachable, which holds any due resume until
+    # the sign-in completes.
+
+    CONNECTING = "connecting"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        base_backoff=AUTH_RETRY_BASE_BACKOFF,
+        max_backoff=AUTH_RETRY_MAX_BACKOFF,
+    ):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CONNECTING
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.state == self.READY
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.state = self.CONNECTING
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def retry(self):
+        if self.state == self.FAILED:
+            self.start()
+            scheduler.wake()
+
+    def _run(self):
+        attempt = 0
+        while running:
+            try:
+                init_spotify()
+                check_spotify_auth()
+            except Exception as e:
+                if is_fatal_auth_error(e):
+                    console.log(f"[bold red]Spotify sign-in failed:[/bold red] {e}")
+                    self.state = self.FAILED
+                    scheduler.wake()
+                    return
+                backoff = min(self.max_backoff, self.base_backoff * 2**attempt)
+                # Equal jitter, as in CircuitBreaker
+                delay = backoff / 2 + random.uniform(0, backoff / 2)
+                attempt += 1
+                console.log(
+                    f"[yellow]Couldn't reach Spotify:[/yellow] {e}. "
+                    f"Retrying in {delay:.0f}s."
+                )
+                time.sleep(delay)
+                continue
+
+            self.state = self.READY
+            token_refresher.start(sp.auth_manager)
+            startup_timer.mark("spotify")
+            device_cache.refresh_async()
+            # Let a resume that came due while connecting go ahead now
+            scheduler.wake()
+            return
+
+
+spotify_connector = SpotifyConnector()
+
+
+# ==========================================================
+# IPC
+# ==========================================================
+
+# JSON-RPC 2.0 error codes
+RPC_PARSE_ERROR = -32700
+RPC_INVALID_REQUEST = -32600
+RPC_METHOD_NOT_FOUND = -32601
+RPC_INVALID_PARAMS = -32602
+RPC_SERVER_ERROR = -32000
+
+
+def default_ipc_address():
+    # Per-user, so two users on one machine each get their own instance
+    if sys.platform == "win32":
+        return rf"\\.\pipe\NoSilence-{os.environ.get('USERNAME', 'user')}"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"nosilence-{os.getuid()}.sock")
+
+
+def encode_rpc_error(request_id, code, message):
+    error = {"code": code, "message": message}
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "error": error}).encode(
+        "utf-8"
+    )
+
+
+class IpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def ipc_status():
+    # Built from in-memory state only; never touches Spotify or audio
+    state = monitor_state
+    return {
+        "text": countdown_text,
+        "armed": bool(state and state.armed),
+        "paused": paused,
+        "silence_timeout": SILENCE_TIMEOUT,
+        "spotify": spotify_connector.state,
+        "spotify_reachable": spotify_connector.ready
+        and spotify_connection_state == CircuitBreaker.CLOSED,
+        "resume_in_progress": resume_worker.busy,
+        "last_resume_result": resume_worker.last_result,
+    }
+
+
+def ipc_pause(paused=True):
+    if not isinstance(paused, bool):
+        raise IpcError(RPC_INVALID_PARAMS, "paused must be true or false")
+    set_paused(paused)
+    return ipc_status()
+
+
+def ipc_set_timeout(seconds):
+    if isinstance(seconds, bool) or not isinstance(seconds, (int, float)):
+        raise IpcError(RPC_INVALID_PARAMS, "seconds must be a number")
+    # Same range as the tray's custom timeout dialog
+    if not math.isfinite(seconds) or not 0 < seconds <= 9999:
+        raise IpcError(RPC_INVALID_PARAMS, "seconds must be between 0 and 9999")
+    set_timeout(seconds)
+    return ipc_status()
+
+
+def ipc_force_resume():
+    if not spotify_connector.ready:
+        raise IpcError(RPC_SERVER_ERROR, "Not signed in to Spotify yet")
+    return {"started": resume_worker.submit()}
+
+
+def ipc_reconnect():
+    # Headless mode has no tray Retry item, so this is its way back after a
+    # failed sign-in
+    spotify_connector.retry()
+    return ipc_status()
+
+
+IPC_METHODS: dict[str, Callable[..., Any]] = {
+    "status": ipc_status,
+    "pause": ipc_pause,
+    "set_timeout": ipc_set_timeout,
+    "force_resume": ipc_force_resume,
+    "reconnect": ipc_reconnect,
+}
+
+
+class SocketChannel:
+    # Newline-delimited JSON over a Unix socket (works with socat / nc -U)
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.file = sock.makefile("rwb")
+
+    def recv(self):
+        return self.file.readline() or None
+
+    def send(self, data):
+        self.file.write(data + b"\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+class PipeChannel:
+    # One JSON message per named pipe message (Windows)
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def recv(self):
+        try:
+            return self.conn.recv_bytes()
+        except EOFError:
+            return None
+
+    def send(self, data):
+        self.conn.send_bytes(data)
+
+    def close(self):
+        self.conn.close()
+
+
+class IpcServer:
+    # Local JSON-RPC 2.0 API for scripts: status and a few commands, served
+    # from in-memory state. "subscribe" turns a connection into a one-way
+    # stream of "status" notifications, sent whenever the status changes.
+    # Subscribers that fall behind lose events rather than slow the monitor.
+
+    def __init__(self, address=None, queue_size=100):
+        self.address = address or default_ipc_address()
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: list[queue.Queue] = []
+        self._last_status = None
+        # A listening socket, or a multiprocessing Listener on Windows
+        self._listener: Any = None
+
+    def start(self):
+        try:
+            if sys.platform == "win32":
+                from multiprocessing.connection import Listener
+
+                self._listener = Listener(self.address, family="AF_PIPE")
+                accept = self._accept_pipe
+            else:
+                self._listener = self._bind_unix_socket()
+                accept = self._accept_socket
+        except OSError as e:
+            console.log(f"[yellow]IPC unavailable:[/yellow] {e}")
+            return False
+        threading.Thread(target=accept, daemon=True).start()
+        console.log(f"IPC listening on [cyan]{self.address}[/cyan]")
+        return True
+
+    def _bind_unix_socket(self):
+        if sys.platform == "win32":
+            raise OSError("Unix sockets aren't available on Windows")
+        if os.path.exists(self.address):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.address)
+            except OSError:
+                # Left behind by an instance that didn't shut down cleanly
+                os.remove(self.address)
+            else:
+                raise OSError(f"another instance is listening on {self.address}")
+            finally:
+                probe.close()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only this user may connect
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.address)
+        finally:
+            os.umask(old_umask)
+        sock.listen()
+        return sock
+
+    def _accept_socket(self):
+        while running:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            self._spawn(SocketChannel(conn))
+
+    def _accept_pipe(self):
+        while running:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return
+            self._spawn(PipeChannel(conn))
+
+    def _spawn(self, channel):
+        threading.Thread(target=self._serve, args=(channel,), daemon=True).start()
+
+    def close(self):
+        if self._listener is None:
+            return
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+        if sys.platform != "win32":
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+        self._listener = None
+
+    def _serve(self, channel):
+        try:
+            while True:
+                data = channel.recv()
+                if data is None:
+                    return
+                if not data.strip():
+                    continue
+                response, subscribe = self.handle(data)
+                if response is not None:
+                    channel.send(response)
+                if subscribe:
+                    self._stream_events(channel)
+                    return
+        except OSError:
+            pass
+        finally:
+            channel.close()
+
+    def handle(self, data):
+        # Returns (encoded response, or None for a notification; subscribe?)
+        try:
+            request = json.loads(data)
+        except ValueError:
+            return encode_rpc_error(None, RPC_PARSE_ERROR, "Parse error"), False
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return encode_rpc_error(None, RPC_INVALID_REQUEST, "Invalid request"), False
+
+        request_id = request.get("id")
+        method = request["method"]
+        subscribe = method == "subscribe"
+        try:
+            result = {"subscribed": True} if subscribe else self.call(request)
+        except IpcError as e:
+            response = encode_rpc_error(request_id, e.code, e.message)
+            subscribe = False
+        else:
+            response = json.dumps(
+                {"jsonrpc": "2.0", "id": request_id, "result": result}
+            ).encode("utf-8")
+
+        if "id" not in request:
+            # Notifications are carried out but never answered
+            return None, subscribe
+        return response, subscribe
+
+    def call(self, request):
+        method = request["method"]
+        params = request.get("params") or {}
+        handler = IPC_METHODS.get(method)
+        if handler is None:
+            raise IpcError(RPC_METHOD_NOT_FOUND, f"Unknown method: {method}")
+        try:
+            if isinstance(params, list):
+                return handler(*params)
+            return handler(**params)
+        except TypeError as e:
+            raise IpcError(RPC_INVALID_PARAMS, str(e))
+        except IpcError:
+            raise
+        except Exception as e:
+            raise IpcError(RPC_SERVER_ERROR, str(e))
+
+    def _stream_events(self, channel):
+        events: queue.Queue = queue.Queue(self.queue_size)
+        events.put({"jsonrpc": "2.0", "method": "status", "params": ipc_status()})
+        with self._lock:
+            self._subscribers.append(events)
+        try:
+            while running:
+                channel.send(json.dumps(events.get()).encode("utf-8"))
+        finally:
+            with self._lock:
+                self._subscribers.remove(events)
+
+    def publish_status(self):
+        # Called every monitor tick; does nothing unless someone's listening
+        if not self._subscribers:
+            return
+        status = ipc_status()
+        if status == self._last_status:
+            return
+        self._last_status = status
+        event = {"jsonrpc": "2.0", "method": "status", "params": status}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                pass
+
+
+ipc_server = IpcServer()
 
 
 # ==========================================================
@@ -1090,36 +4081,127 @@ def check_spotify_auth():
 # ==========================================================
 
 
+def run_headless():
+    # The same monitoring and resume logic on the main thread, without a tray.
+    # Ctrl+C or SIGTERM stops it.
+    def stop(signum, frame):
+        global running
+        running = False
+        scheduler.wake()
+
+    signal.signal(signal.SIGTERM, stop)
+    startup_timer.mark("monitor")
+    startup_timer.report()
+    try:
+        monitor_loop()
+    except KeyboardInterrupt:
+        pass
+    shutdown()
+
+
+def on_tray_ready(icon):
+    icon.visible = True
+    startup_timer.mark("tray")
+    startup_timer.report()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resume Spotify after silence.")
+    parser.add_argument(
+        "--record-trace",
+        metavar="PATH",
+        help="record every audio sample to a binary trace file",
+    )
+    parser.add_argument(
+        "--replay-trace",
+        metavar="PATH",
+        help="replay a recorded trace through the resume logic and exit",
+    )
+    parser.add_argument(
+        "--threshold", type=float, help="silence threshold to use for --replay-trace"
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="silence timeout to use for --replay-trace"
+    )
+    parser.add_argument(
+        "--activation-duration",
+        type=float,
+        help="activation duration to use for --replay-trace",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a tray icon, e.g. as a daemon on Linux",
+    )
+    parser.add_argument(
+        "--audio-backend",
+        choices=sorted(AUDIO_BACKENDS),
+        help="where audio levels come from (default: windows or pulse by platform)",
+    )
+    return parser.parse_args()
+
+
 def main():
-    global tray_icon
+    global tray_icon, trace_recorder, session_registry, HEADLESS
+    args = parse_args()
+    HEADLESS = args.headless
+    if pystray is None and not HEADLESS:
+        console.print("[bold red]No system tray available; use --headless.[/bold red]")
+        sys.exit(1)
+    if sys.stderr is not None and sys.stderr.isatty():
+        # Pretty tracebacks only help when there's a terminal to show them
+        from rich.traceback import install
+
+        install()
     console.print(f"[bold green]NoSilence v{VERSION}[/bold green]")
     # Load config first
     load_config()
+    startup_timer.mark("config")
+
+    if args.replay_trace:
+        config = current_monitor_config()
+        if args.timeout is not None:
+            config.silence_timeout = args.timeout
+        if args.activation_duration is not None:
+            config.min_activation_duration = args.activation_duration
+        threshold = SILENCE_THRESHOLD if args.threshold is None else args.threshold
+        replay_trace(args.replay_trace, config, threshold)
+        return
+
+    load_secrets()
+    startup_timer.mark("secrets")
+
+    if args.audio_backend:
+        session_registry = AudioSessionRegistry(
+            create_audio_backend(args.audio_backend)
+        )
 
-    # Initialize Spotify
-    try:
-        init_spotify()
-        check_spotify_auth()
-    except Exception as e:
-        console.log(f"[bold red]Initialization failed:[/bold red] {e}")
-        # Only retry if it's a network error, not an auth failure
-        if "Authentication" in str(e):
-            sys.exit(1)
+    if args.record_trace:
+        trace_recorder = TraceRecorder(args.record_trace)
+        console.log(f"Recording audio trace to [cyan]{args.record_trace}[/cyan]")
+    config_persistence.remember_file()
+    config_persistence.start()
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+    if IPC_ENABLED:
+        ipc_server.start()
+    configure_profiling_from_env()
 
-        console.log("[blue]Retrying in 10 seconds...[/blue]")
-        time.sleep(10)
-        try:
-            init_spotify()
-            check_spotify_auth()
-        except Exception as e2:
-            console.log(f"[bold red]Final initialization failed:[/bold red] {e2}")
-            sys.exit(1)
+    # Sign in concurrently so the tray shows up straight away
+    spotify_connector.start()
+
+    resume_worker.start()
+
+    if HEADLESS:
+        run_headless()
+        return
 
     monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
     monitor_thread.start()
 
     tray_icon = setup_tray()
-    tray_icon.run()
+    profiler.register_thread("tray")
+    tray_icon.run(setup=on_tray_ready)
 
 
 if __name__ == "__main__":
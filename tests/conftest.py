@@ -0,0 +1,4 @@
+import os
+
+# pystray picks a GUI backend on import; the dummy one needs no display
+os.environ.setdefault("PYSTRAY_BACKEND", "dummy")
@@ -0,0 +1,144 @@
+import pytest
+
+import main
+from main import (
+    SESSION_BLOCKING,
+    SESSION_IGNORED,
+    SESSION_OTHER,
+    SESSION_SPOTIFY,
+    AudioSessionRegistry,
+    FakeAudioBackend,
+)
+
+
+@pytest.fixture
+def rules(monkeypatch):
+    # Installs audio rules for one test, as a config reload would
+    def install(config):
+        monkeypatch.setattr(main, "AUDIO_RULES", config)
+        main.compile_audio_rules()
+
+    monkeypatch.setattr(main, "audio_rules", main.AudioRules())
+    return install
+
+
+def make_registry(peaks, resync_interval=60):
+    backend = FakeAudioBackend(peaks)
+    registry = AudioSessionRegistry(backend, resync_interval=resync_interval)
+    registry.start()
+    return backend, registry
+
+
+def by_name(readings):
+    return {name: (peak, kind, threshold) for name, peak, kind, threshold in readings}
+
+
+def test_reads_every_session(rules):
+    _, registry = make_registry({"spotify.exe": 0.5, "chrome.exe": 0.0})
+
+    assert by_name(registry.read_peaks()) == {
+        "spotify.exe": (0.5, SESSION_SPOTIFY, None),
+        "chrome.exe": (0.0, SESSION_OTHER, None),
+    }
+
+
+def test_new_session_is_picked_up_before_resync(rules):
+    backend, registry = make_registry({"chrome.exe": 0.0})
+
+    backend.set_peak("game.exe", 0.2)
+
+    assert by_name(registry.read_peaks())["game.exe"] == (0.2, SESSION_OTHER, None)
+
+
+def test_ended_session_is_dropped(rules):
+    backend, registry = make_registry({"chrome.exe": 0.1, "game.exe": 0.2})
+
+    backend.remove("game.exe")
+
+    assert set(by_name(registry.read_peaks())) == {"chrome.exe"}
+    assert set(registry.entries) == {"chrome.exe"}
+
+
+def test_peaks_are_read_live(rules):
+    backend, registry = make_registry({"chrome.exe": 0.0})
+
+    backend.set_peak("chrome.exe", 0.3)
+
+    assert by_name(registry.read_peaks())["chrome.exe"][0] == 0.3
+
+
+def test_master_peak_is_loudest_session(rules):
+    _, registry = make_registry({"chrome.exe": 0.1, "game.exe": 0.4})
+
+    assert registry.read_master_peak() == 0.4
+
+
+def test_master_peak_unsupported(rules):
+    class NoMasterBackend(FakeAudioBackend):
+        def open_master_meter(self):
+            return None
+
+    registry = AudioSessionRegistry(NoMasterBackend({"chrome.exe": 0.1}))
+    registry.start()
+
+    assert registry.read_master_peak() is None
+    assert [name for name, *_ in registry.read_peaks()] == ["chrome.exe"]
+
+
+def test_sessions_are_reclassified_when_rules_change(rules):
+    _, registry = make_registry({"teams.exe": 0.5, "chrome.exe": 0.5})
+    assert by_name(registry.read_peaks())["teams.exe"][1] == SESSION_OTHER
+
+    rules(
+        [
+            {"exe": "teams.exe", "action": "never_resume"},
+            {"exe": "chrome.exe", "action": "ignore", "threshold": 0.1},
+        ]
+    )
+
+    readings = by_name(registry.read_peaks())
+    assert readings["teams.exe"] == (0.5, SESSION_BLOCKING, None)
+    assert readings["chrome.exe"] == (0.5, SESSION_IGNORED, 0.1)
+
+
+def test_audio_state(rules, monkeypatch):
+    backend, registry = make_registry({"spotify.exe": 0.0, "teams.exe": 0.0})
+    monkeypatch.setattr(main, "session_registry", registry)
+    monkeypatch.setattr(main, "SILENCE_THRESHOLD", 0.01)
+    rules([{"exe": "teams.exe", "action": "never_resume"}])
+
+    assert main.get_audio_state() == (False, False, False)
+
+    backend.set_peak("teams.exe", 0.5)
+    assert main.get_audio_state() == (False, False, True)
+
+    backend.set_peak("spotify.exe", 0.5)
+    assert main.get_audio_state() == (True, False, True)
+
+
+def test_rule_threshold_below_global_bypasses_master_peak(rules, monkeypatch):
+    backend, registry = make_registry({"quiet.exe": 0.005})
+    monkeypatch.setattr(main, "session_registry", registry)
+    monkeypatch.setattr(main, "SILENCE_THRESHOLD", 0.01)
+
+    assert main.get_audio_state() == (False, False, False)
+
+    rules([{"exe": "quiet.exe", "threshold": 0.001}])
+    assert main.get_audio_state() == (False, True, False)
+
+
+def test_start_survives_backend_failure(rules):
+    class FlakyBackend(FakeAudioBackend):
+        failures = 1
+
+        def list_sessions(self):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("audio service not running")
+            return super().list_sessions()
+
+    registry = AudioSessionRegistry(FlakyBackend({"chrome.exe": 0.1}))
+    registry.start()
+    assert registry.entries == {}
+
+    assert by_name(registry.read_peaks()) == {"chrome.exe": (0.1, SESSION_OTHER, None)}
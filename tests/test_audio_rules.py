@@ -0,0 +1,151 @@
+import pytest
+
+from main import (
+    SESSION_BLOCKING,
+    SESSION_IGNORED,
+    SESSION_OTHER,
+    SESSION_SPOTIFY,
+    AudioRules,
+    classify_readings,
+    parse_audio_rule,
+)
+
+
+def test_defaults_without_rules():
+    rules = AudioRules()
+
+    assert rules.classify("spotify.exe") == (SESSION_SPOTIFY, None)
+    assert rules.classify("spotify") == (SESSION_SPOTIFY, None)
+    assert rules.classify("chrome.exe") == (SESSION_OTHER, None)
+    assert rules.min_threshold is None
+
+
+def test_exe_name():
+    rules = AudioRules([{"exe": "Teams.exe", "action": "never_resume"}])
+
+    assert rules.classify("teams.exe") == (SESSION_BLOCKING, None)
+    assert rules.classify("teamsx.exe") == (SESSION_OTHER, None)
+
+
+def test_exe_wildcards():
+    rules = AudioRules([{"exe": "chrome*.exe", "action": "ignore"}])
+
+    assert rules.classify("chrome.exe")[0] == SESSION_IGNORED
+    assert rules.classify("chrome_beta.exe")[0] == SESSION_IGNORED
+    assert rules.classify("chromium.exe")[0] == SESSION_OTHER
+
+
+def test_question_mark_matches_one_character():
+    rules = AudioRules([{"exe": "game?.exe", "action": "ignore"}])
+
+    assert rules.classify("game1.exe")[0] == SESSION_IGNORED
+    assert rules.classify("game12.exe")[0] == SESSION_OTHER
+
+
+def test_path():
+    rules = AudioRules([{"path": r"C:\Program Files\Zoom\*", "action": "never_resume"}])
+
+    assert rules.classify("zoom.exe", r"c:\program files\zoom\bin\zoom.exe") == (
+        SESSION_BLOCKING,
+        None,
+    )
+    assert rules.classify("zoom.exe", r"D:\Zoom\zoom.exe") == (SESSION_OTHER, None)
+    assert rules.classify("zoom.exe") == (SESSION_OTHER, None)
+
+
+def test_path_brackets_are_literal():
+    rules = AudioRules([{"path": "/opt/app [beta]/*", "action": "ignore"}])
+
+    assert rules.classify("app", "/opt/app [beta]/app")[0] == SESSION_IGNORED
+    assert rules.classify("app", "/opt/app b/app")[0] == SESSION_OTHER
+
+
+def test_display_name():
+    rules = AudioRules([{"name": "System Sounds", "action": "ignore"}])
+
+    assert rules.classify("", "", "system sounds") == (SESSION_IGNORED, None)
+
+
+def test_threshold_only_keeps_default_kind():
+    rules = AudioRules(
+        [
+            {"exe": "spotify.exe", "threshold": 0.2},
+            {"exe": "chrome.exe", "threshold": 0.05},
+        ]
+    )
+
+    assert rules.classify("spotify.exe") == (SESSION_SPOTIFY, 0.2)
+    assert rules.classify("chrome.exe") == (SESSION_OTHER, 0.05)
+    assert rules.min_threshold == 0.05
+
+
+def test_first_matching_rule_wins():
+    rules = AudioRules(
+        [
+            {"name": "Call", "action": "never_resume"},
+            {"exe": "chrome*.exe", "threshold": 0.05},
+            {"exe": "chrome.exe", "action": "ignore"},
+        ]
+    )
+
+    assert rules.classify("chrome.exe") == (SESSION_OTHER, 0.05)
+    assert rules.classify("chrome.exe", "", "Call") == (SESSION_BLOCKING, None)
+
+
+def test_earlier_wildcard_beats_later_exact_name():
+    rules = AudioRules(
+        [
+            {"exe": "*.exe", "action": "ignore"},
+            {"exe": "teams.exe", "action": "never_resume"},
+        ]
+    )
+
+    assert rules.classify("teams.exe")[0] == SESSION_IGNORED
+
+
+def test_invalid_rules_are_skipped():
+    rules = AudioRules(
+        [
+            "teams.exe",
+            {"exe": "a.exe"},
+            {"exe": "b.exe", "name": "B", "action": "ignore"},
+            {"exe": "c.exe", "action": "mute"},
+            {"exe": "d.exe", "threshold": "loud"},
+            {"exe": "e.exe", "threshold": [1]},
+            {"exe": 5, "action": "ignore"},
+            {"exe": "ok.exe", "action": "ignore"},
+        ]
+    )
+
+    assert rules.rules == [(SESSION_IGNORED, None)]
+    assert rules.classify("ok.exe")[0] == SESSION_IGNORED
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [{}, {"exe": "a"}, {"path": "a", "name": "b", "action": "ignore"}],
+)
+def test_parse_rejects(rule):
+    with pytest.raises(ValueError):
+        parse_audio_rule(rule)
+
+
+def test_pid_cache_notices_reused_pid():
+    rules = AudioRules([{"exe": "teams.exe", "action": "never_resume"}])
+
+    assert rules.classify("teams.exe", pid=42)[0] == SESSION_BLOCKING
+    assert rules.classify("teams.exe", pid=42)[0] == SESSION_BLOCKING
+    assert rules.classify("game.exe", pid=42)[0] == SESSION_OTHER
+
+
+def test_classify_readings():
+    readings = [
+        ("spotify.exe", 0.0, SESSION_SPOTIFY, None),
+        ("chrome.exe", 0.02, SESSION_OTHER, 0.05),
+        ("system", 0.9, SESSION_IGNORED, None),
+        ("teams.exe", 0.5, SESSION_BLOCKING, None),
+    ]
+
+    assert classify_readings(readings, 0.01) == (False, False, True)
+    readings[1] = ("chrome.exe", 0.06, SESSION_OTHER, 0.05)
+    assert classify_readings(readings, 0.01) == (False, True, True)
@@ -0,0 +1,40 @@
+import json
+import os
+import stat
+
+import main
+from main import write_json_atomic
+
+
+def file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_keeps_existing_mode(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    os.chmod(path, 0o640)
+
+    write_json_atomic(str(path), {"a": 1})
+
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert file_mode(path) == 0o640
+
+
+def test_new_file_gets_default_mode(tmp_path):
+    path = tmp_path / "config.json"
+
+    write_json_atomic(str(path), {})
+
+    assert file_mode(path) == main.NEW_FILE_MODE
+
+
+def test_explicit_mode(tmp_path):
+    path = tmp_path / ".cache"
+    path.write_text("{}")
+    os.chmod(path, 0o644)
+
+    write_json_atomic(str(path), {}, prefix=".cache-", mode=0o600)
+
+    assert file_mode(path) == 0o600
+    assert os.listdir(tmp_path) == [".cache"]
@@ -0,0 +1,19 @@
+import pytest
+
+from main import format_badge
+
+
+@pytest.mark.parametrize(
+    "remaining, badge",
+    [
+        (0, "0"),
+        (9, "9"),
+        (99, "99"),
+        (100, "2m"),
+        (119, "2m"),
+        (120, "2m"),
+        (121, "3m"),
+    ],
+)
+def test_format_badge(remaining, badge):
+    assert format_badge(remaining) == badge
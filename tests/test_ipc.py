@@ -0,0 +1,36 @@
+import pytest
+
+import main
+from main import RPC_INVALID_PARAMS, IpcError, SpotifyConnector, ipc_set_timeout
+
+
+@pytest.mark.parametrize(
+    "seconds", [0, -5, 10000, float("inf"), float("nan"), True, "30", None]
+)
+def test_set_timeout_rejects(seconds, monkeypatch):
+    monkeypatch.setattr(main, "set_timeout", pytest.fail)
+
+    with pytest.raises(IpcError) as excinfo:
+        ipc_set_timeout(seconds)
+    assert excinfo.value.code == RPC_INVALID_PARAMS
+
+
+def test_spotify_unreachable_while_connecting(monkeypatch):
+    monkeypatch.setattr(main.spotify_connector, "state", SpotifyConnector.CONNECTING)
+
+    assert main.ipc_status()["spotify_reachable"] is False
+
+    monkeypatch.setattr(main.spotify_connector, "state", SpotifyConnector.READY)
+    assert main.ipc_status()["spotify_reachable"] is True
+
+
+def test_reconnect_retries_failed_sign_in(monkeypatch):
+    connector = SpotifyConnector()
+    connector.state = SpotifyConnector.FAILED
+    monkeypatch.setattr(main, "spotify_connector", connector)
+    started = []
+    monkeypatch.setattr(connector, "start", lambda: started.append(True))
+
+    main.IPC_METHODS["reconnect"]()
+
+    assert started == [True]
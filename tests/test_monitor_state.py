@@ -0,0 +1,172 @@
+import main
+from main import (
+    ACTION_ARMED,
+    ACTION_CLEAR_RESUME_RESULT,
+    ACTION_PREFETCH,
+    ACTION_RESUME,
+    ACTION_WARM_UP,
+    MonitorConfig,
+    MonitorState,
+    simulate_monitor,
+)
+
+
+def make_config(require_non_spotify_sound=True):
+    return MonitorConfig(
+        silence_timeout=10,
+        min_activation_duration=3,
+        require_non_spotify_sound=require_non_spotify_sound,
+        polling_interval=1,
+    )
+
+
+def run(samples, config):
+    # samples are (now, spotify, others, blocking); returns {now: decision}
+    return dict(simulate_monitor(iter(samples), config))
+
+
+def others_then_silence(sound_seconds, end):
+    return [(t, False, t < sound_seconds, False) for t in range(end)]
+
+
+def resumes(decisions):
+    return [now for now, d in decisions.items() if ACTION_RESUME in d.actions]
+
+
+def test_arms_after_activation_duration():
+    decisions = run(others_then_silence(5, 6), make_config())
+
+    assert ACTION_ARMED not in decisions[2].actions
+    assert decisions[3].actions == [ACTION_ARMED]
+    assert decisions[3].text == "Other sound playing... (Armed)"
+    # Only announced once
+    assert ACTION_ARMED not in decisions[4].actions
+
+
+def test_short_sound_does_not_arm():
+    decisions = run(others_then_silence(2, 30), make_config())
+
+    assert not resumes(decisions)
+    assert decisions[29].text == "Idle (Not Armed)"
+    assert decisions[29].icon_state == "unarmed"
+
+
+def test_countdown_then_resume():
+    # Sound stops at t=4 (last heard at t=4), timeout is 10s
+    decisions = run(others_then_silence(5, 20), make_config())
+
+    assert decisions[5].text == "Resuming in 9s (Armed)"
+    assert decisions[5].icon_badge == 9
+    assert decisions[5].icon_state == "armed"
+    assert ACTION_WARM_UP in decisions[10].actions
+    assert ACTION_PREFETCH not in decisions[10].actions
+    assert ACTION_PREFETCH in decisions[12].actions
+    assert resumes(decisions) == [14]
+    # Disarmed by the resume
+    assert decisions[15].text == "Idle (Not Armed)"
+
+
+def test_countdown_polls_at_deadline():
+    config = MonitorConfig(10.5, 3, True, 5)
+    samples = [(t, False, t < 5, False) for t in range(14)]
+    decisions = run(samples, config)
+
+    assert decisions[13].poll_interval == 1.5
+
+
+def test_spotify_playing_disarms():
+    samples = others_then_silence(5, 6) + [(6, True, False, False)]
+    samples += [(t, False, False, False) for t in range(7, 30)]
+    decisions = run(samples, make_config())
+
+    assert decisions[6].text == "Spotify playing (Not Armed)"
+    assert ACTION_CLEAR_RESUME_RESULT in decisions[6].actions
+    assert not resumes(decisions)
+
+
+def test_no_arming_needed_when_not_required():
+    samples = [(t, False, False, False) for t in range(15)]
+    decisions = run(samples, make_config(require_non_spotify_sound=False))
+
+    assert decisions[0].text == "Resuming in 10s"
+    assert resumes(decisions) == [10]
+
+
+def test_pause_resets_state():
+    config = make_config()
+    state = MonitorState(0, armed=True, activity_start=0)
+
+    state, decision = state.transition(50, False, False, config, paused=True)
+
+    assert decision.text == "Paused"
+    assert decision.icon_state == "paused"
+    assert decision.actions == []
+    assert decision.poll_interval == config.polling_interval * (
+        main.PAUSED_POLLING_FACTOR
+    )
+    assert state.last_sound_time == 50
+    assert not state.armed
+    assert state.activity_start is None
+
+
+def test_waits_for_spotify_when_unreachable():
+    config = make_config()
+    state = MonitorState(0, armed=True)
+
+    state, decision = state.transition(
+        20, False, False, config, spotify_reachable=False
+    )
+    assert decision.text == "Waiting for Spotify... (Armed)"
+    assert ACTION_RESUME not in decision.actions
+    assert state.armed
+
+    state, decision = state.transition(21, False, False, config)
+    assert ACTION_RESUME in decision.actions
+
+
+def test_resume_status_is_shown():
+    config = make_config()
+    state = MonitorState(0)
+
+    _, decision = state.transition(1, False, False, config, resume_status="busy")
+    assert decision.text == "Resume in progress... (Not Armed)"
+
+    _, decision = state.transition(1, False, False, config, resume_status="failed")
+    assert decision.text == "Idle - Resume failed (Not Armed)"
+
+
+def test_blocking_sound_holds_countdown():
+    # Armed by other sound until t=4, then a never-resume app until t=30
+    samples = [(t, False, t < 5, 5 <= t < 30) for t in range(50)]
+    decisions = run(samples, make_config())
+
+    assert decisions[10].text == "Resume on hold... (Armed)"
+    assert decisions[10].icon_state == "armed"
+    assert decisions[10].icon_badge is None
+    assert decisions[30].text == "Resuming in 9s (Armed)"
+    assert resumes(decisions) == [39]
+
+
+def test_blocking_sound_does_not_arm():
+    samples = [(t, False, False, t < 20) for t in range(40)]
+    decisions = run(samples, make_config())
+
+    assert decisions[10].text == "Resume on hold... (Not Armed)"
+    assert decisions[10].icon_state == "unarmed"
+    assert all(ACTION_ARMED not in d.actions for d in decisions.values())
+    assert not resumes(decisions)
+
+
+def test_blocking_sound_holds_when_arming_not_required():
+    samples = [(t, False, False, t < 20) for t in range(40)]
+    decisions = run(samples, make_config(require_non_spotify_sound=False))
+
+    assert decisions[10].text == "Resume on hold..."
+    assert resumes(decisions)[0] == 29
+
+
+def test_other_sound_wins_over_blocking():
+    state = MonitorState(0)
+    _, decision = state.transition(1, False, True, make_config(), blocking_playing=True)
+
+    assert decision.text == "Other sound playing... (Not Armed)"
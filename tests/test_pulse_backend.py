@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from main import PulseAudioBackend
+
+
+class FakePulse:
+    def __init__(self):
+        self.sinks = {0: "speakers.monitor", 1: "headphones.monitor"}
+        self.sink_inputs = {7: SimpleNamespace(index=7, sink=0, proplist={})}
+        self.peaks = {"speakers.monitor": 0.1, "headphones.monitor": 0.6}
+
+    def sink_input_list(self):
+        return list(self.sink_inputs.values())
+
+    def sink_input_info(self, index):
+        return self.sink_inputs[index]
+
+    def sink_info(self, index):
+        return SimpleNamespace(monitor_source=self.sinks[index])
+
+    def sink_default_get(self):
+        return SimpleNamespace(monitor_source=self.sinks[0])
+
+    def get_peak_sample(self, source, timeout, stream_index=None):
+        return self.peaks[source]
+
+
+def make_backend():
+    pulse = FakePulse()
+    backend = PulseAudioBackend()
+    backend._pulse = pulse
+    backend._pulsectl = SimpleNamespace(PulseDisconnected=ConnectionError)
+    return pulse, backend
+
+
+def test_stream_moved_to_another_sink():
+    pulse, backend = make_backend()
+    meter = backend.open_meter(backend.list_sessions()[7])
+    assert backend.read_peak(meter) == 0.1
+
+    pulse.sink_inputs[7].sink = 1
+
+    assert backend.read_peak(meter) == 0.6
+
+
+def test_master_meter_reads_default_sink():
+    _, backend = make_backend()
+
+    assert backend.read_peak(backend.open_master_meter()) == 0.1
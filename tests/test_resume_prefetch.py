@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from main import ResumePrefetcher
+
+
+class FakeAuthManager:
+    def __init__(self, token_info):
+        self.token_info = token_info
+        self.cache_handler = SimpleNamespace(get_cached_token=lambda: token_info)
+
+    def validate_token(self, token_info):
+        return token_info
+
+    def get_access_token(self, as_dict=True):
+        pytest.fail("would prompt for an interactive sign-in")
+
+
+def install_spotify(monkeypatch, token_info):
+    playback = {"is_playing": True}
+    fake_sp = SimpleNamespace(
+        auth_manager=FakeAuthManager(token_info), current_playback=lambda: playback
+    )
+    monkeypatch.setattr(main, "sp", fake_sp)
+    monkeypatch.setattr(main, "get_device_id_by_name", lambda name: "device-1")
+
+
+def test_prefetch_snapshot(monkeypatch):
+    install_spotify(monkeypatch, {"access_token": "token"})
+    prefetcher = ResumePrefetcher()
+
+    prefetcher._run()
+
+    snapshot = prefetcher.take()
+    assert snapshot.device_id == "device-1"
+    assert snapshot.is_playing
+    assert prefetcher.take() is None
+
+
+def test_prefetch_skipped_without_cached_token(monkeypatch):
+    install_spotify(monkeypatch, None)
+    prefetcher = ResumePrefetcher()
+
+    prefetcher._run()
+
+    assert prefetcher.take() is None
+    assert not prefetcher._running
@@ -0,0 +1,358 @@
+# mock_spotify_server.py
+# A local stand-in for the parts of the Spotify Web API that NoSilence uses,
+# for load testing and fault injection without touching the real service.
+#
+#   python tools/mock_spotify_server.py --latency 150 --fail-429 0.1 \
+#       --write-cache .cache
+#
+# Then point the app at it in config.json:
+#
+#   "spotify_api_url": "http://127.0.0.1:8899/v1/",
+#   "spotify_token_url": "http://127.0.0.1:8899/api/token"
+#
+# Faults can also be changed while it runs:
+#
+#   curl -X POST localhost:8899/_mock/config -d '{"fail_5xx": 0.5}'
+#   curl localhost:8899/_mock/stats
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SCOPE = "user-modify-playback-state user-read-playback-state"
+
+# Fault settings that can be changed at runtime through /_mock/config
+DEFAULT_SETTINGS = {
+    "latency_ms": 0.0,
+    "jitter_ms": 0.0,
+    "fail_404": 0.0,
+    "fail_429": 0.0,
+    "fail_5xx": 0.0,
+    "drop": 0.0,
+    "retry_after": 1,
+}
+
+
+class MockSpotify:
+    def __init__(self, device_names, settings):
+        self.lock = threading.Lock()
+        self.settings = dict(DEFAULT_SETTINGS, **settings)
+        self.devices = [
+            {
+                "id": f"mock-device-{i}",
+                "name": name,
+                "type": "Computer",
+                "is_active": i == 0,
+                "volume_percent": 50,
+            }
+            for i, name in enumerate(device_names)
+        ]
+        self.is_playing = False
+        self.has_context = True
+        self.stats = {}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def find_device(self, device_id):
+        if device_id is None:
+            return next((d for d in self.devices if d["is_active"]), None)
+        return next((d for d in self.devices if d["id"] == device_id), None)
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "MockSpotify/1.0"
+    mock: MockSpotify
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:  # type: ignore[attr-defined]
+            super().log_message(format, *args)
+
+    # ---------- responses ----------
+
+    def send_json(self, status, body=None, headers=None):
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def send_error_json(self, status, message, headers=None):
+        self.send_json(
+            status, {"error": {"status": status, "message": message}}, headers
+        )
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    # ---------- fault injection ----------
+
+    def inject_faults(self, route):
+        # Returns True if the request was answered (or dropped) by a fault
+        with self.mock.lock:
+            settings = dict(self.mock.settings)
+
+        delay = settings["latency_ms"] + random.uniform(0, settings["jitter_ms"])
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        roll = random.random()
+        for kind in ("drop", "fail_429", "fail_5xx", "fail_404"):
+            if roll < settings[kind]:
+                break
+            roll -= settings[kind]
+        else:
+            return False
+
+        self.mock.count(f"fault:{kind}")
+        if kind == "drop":
+            # Hang up without answering, like a dead connection
+            self.close_connection = True
+            return True
+        if kind == "fail_429":
+            self.send_error_json(
+                429,
+                "API rate limit exceeded",
+                {"Retry-After": settings["retry_after"]},
+            )
+        elif kind == "fail_5xx":
+            self.send_error_json(
+                random.choice((500, 502, 503)), "Server error", {"Connection": "close"}
+            )
+        else:
+            self.send_error_json(404, "Device not found")
+        return True
+
+    # ---------- routing ----------
+
+    def handle_request(self, method):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        route = f"{method} {url.path.rstrip('/') or '/'}"
+        self.mock.count(route)
+
+        if url.path.startswith("/_mock/"):
+            return self.handle_control(route)
+
+        handler = ROUTES.get(route)
+        if handler is None:
+            return self.send_error_json(404, f"No mock for {route}")
+
+        body = self.read_body()
+        if self.inject_faults(route):
+            return
+        handler(self, query, body)
+
+    def handle_control(self, route):
+        if route == "GET /_mock/stats":
+            with self.mock.lock:
+                return self.send_json(200, dict(self.mock.stats))
+        if route == "GET /_mock/config":
+            with self.mock.lock:
+                return self.send_json(200, dict(self.mock.settings))
+        if route == "POST /_mock/config":
+            try:
+                changes = json.loads(self.read_body() or b"{}")
+            except ValueError:
+                return self.send_error_json(400, "Invalid JSON")
+            unknown = set(changes) - set(DEFAULT_SETTINGS)
+            if unknown:
+                return self.send_error_json(400, f"Unknown settings: {sorted(unknown)}")
+            with self.mock.lock:
+                self.mock.settings.update(changes)
+                return self.send_json(200, dict(self.mock.settings))
+        self.send_error_json(404, f"No mock control for {route}")
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_HEAD(self):
+        # Used by the app's connection warm-up
+        self.send_response(401)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+
+# ==========================================================
+# ENDPOINTS
+# ==========================================================
+
+
+def get_me(handler, query, body):
+    handler.send_json(
+        200, {"id": "mock-user", "display_name": "Mock User", "type": "user"}
+    )
+
+
+def get_player(handler, query, body):
+    mock = handler.mock
+    with mock.lock:
+        device = mock.find_device(None)
+        if device is None:
+            return handler.send_json(204)
+        handler.send_json(
+            200,
+            {
+                "device": dict(device),
+                "is_playing": mock.is_playing,
+                "progress_ms": 0,
+                "item": None,
+            },
+        )
+
+
+def get_devices(handler, query, body):
+    with handler.mock.lock:
+        handler.send_json(200, {"devices": [dict(d) for d in handler.mock.devices]})
+
+
+def put_play(handler, query, body):
+    mock = handler.mock
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return handler.send_error_json(400, "Invalid JSON")
+
+    with mock.lock:
+        device = mock.find_device(query.get("device_id"))
+        if device is None:
+            return handler.send_error_json(404, "Device not found")
+        if not payload.get("context_uri") and not mock.has_context:
+            return handler.send_error_json(404, "No active context")
+        for d in mock.devices:
+            d["is_active"] = d is device
+        mock.is_playing = True
+        mock.has_context = True
+    handler.send_json(204)
+
+
+def put_volume(handler, query, body):
+    mock = handler.mock
+    try:
+        volume = int(query["volume_percent"])
+    except (KeyError, ValueError):
+        return handler.send_error_json(400, "volume_percent is required")
+
+    with mock.lock:
+        device = mock.find_device(query.get("device_id"))
+        if device is None:
+            return handler.send_error_json(404, "Device not found")
+        device["volume_percent"] = max(0, min(100, volume))
+    handler.send_json(204)
+
+
+def post_token(handler, query, body):
+    form = {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+    if form.get("grant_type") not in ("authorization_code", "refresh_token"):
+        return handler.send_json(400, {"error": "unsupported_grant_type"})
+    handler.send_json(
+        200,
+        {
+            "access_token": secrets.token_urlsafe(24),
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "refresh_token": form.get("refresh_token") or secrets.token_urlsafe(24),
+            "scope": SCOPE,
+        },
+    )
+
+
+ROUTES = {
+    "GET /v1/me": get_me,
+    "GET /v1/me/player": get_player,
+    "GET /v1/me/player/devices": get_devices,
+    "PUT /v1/me/player/play": put_play,
+    "PUT /v1/me/player/volume": put_volume,
+    "POST /api/token": post_token,
+}
+
+
+def write_token_cache(path):
+    # An already-expired token, so the app's first call exercises refresh
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "access_token": "mock-expired",
+                "token_type": "Bearer",
+                "expires_in": 3600,
+                "refresh_token": "mock-refresh",
+                "scope": SCOPE,
+                "expires_at": int(time.time()) - 1,
+            },
+            f,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Spotify Web API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument(
+        "--device",
+        action="append",
+        help="device name to expose (repeatable, default 'Mock PC')",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="ms per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random ms")
+    parser.add_argument("--fail-404", type=float, default=0.0, help="probability")
+    parser.add_argument("--fail-429", type=float, default=0.0, help="probability")
+    parser.add_argument("--fail-5xx", type=float, default=0.0, help="probability")
+    parser.add_argument(
+        "--drop", type=float, default=0.0, help="probability of hanging up"
+    )
+    parser.add_argument(
+        "--retry-after", type=int, default=1, help="Retry-After sent with 429s"
+    )
+    parser.add_argument(
+        "--write-cache",
+        metavar="PATH",
+        help="write a token cache the app can use instead of logging in",
+    )
+    parser.add_argument("--quiet", action="store_true", help="don't log requests")
+    args = parser.parse_args()
+
+    if args.write_cache:
+        write_token_cache(args.write_cache)
+        print(f"Wrote token cache to {args.write_cache}")
+
+    Handler.mock = MockSpotify(
+        args.device or ["Mock PC"],
+        {
+            "latency_ms": args.latency,
+            "jitter_ms": args.jitter,
+            "fail_404": args.fail_404,
+            "fail_429": args.fail_429,
+            "fail_5xx": args.fail_5xx,
+            "drop": args.drop,
+            "retry_after": args.retry_after,
+        },
+    )
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.quiet = args.quiet  # type: ignore[attr-defined]
+    print(f"Mock Spotify API listening on http://{args.host}:{args.port}/v1/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# nosilencectl.py
+# Command-line client for NoSilence's local JSON-RPC API.
+#
+#   python tools/nosilencectl.py status
+#   python tools/nosilencectl.py pause          # or: unpause
+#   python tools/nosilencectl.py timeout 120
+#   python tools/nosilencectl.py resume
+#   python tools/nosilencectl.py reconnect      # retry a failed Spotify sign-in
+#   python tools/nosilencectl.py watch          # stream status changes
+#
+# On Linux/macOS the API is newline-delimited JSON on a Unix socket, so it can
+# also be driven directly:
+#
+#   echo '{"jsonrpc":"2.0","id":1,"method":"status"}' | \
+#       socat - UNIX-CONNECT:$XDG_RUNTIME_DIR/nosilence-$(id -u).sock
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+
+
+def default_address():
+    # Must match default_ipc_address() in src/main.py
+    if sys.platform == "win32":
+        return rf"\\.\pipe\NoSilence-{os.environ.get('USERNAME', 'user')}"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"nosilence-{os.getuid()}.sock")
+
+
+class Connection:
+    def __init__(self, address):
+        if sys.platform == "win32":
+            from multiprocessing.connection import Client
+
+            self._pipe = Client(address, family="AF_PIPE")
+            self._file = None
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(address)
+            self._pipe = None
+            self._file = sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def send(self, message):
+        data = json.dumps(message).encode("utf-8")
+        if self._pipe is not None:
+            self._pipe.send_bytes(data)
+        else:
+            self._file.write(data + b"\n")
+            self._file.flush()
+
+    def receive(self):
+        if self._pipe is not None:
+            data = self._pipe.recv_bytes()
+        else:
+            data = self._file.readline()
+            if not data:
+                raise EOFError("NoSilence closed the connection")
+        return json.loads(data)
+
+    def call(self, method, **params):
+        self.send(
+            {
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": method,
+                "params": params,
+            }
+        )
+        response = self.receive()
+        if "error" in response:
+            raise RuntimeError(response["error"]["message"])
+        return response["result"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control a running NoSilence.")
+    parser.add_argument("--address", default=default_address())
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="print the current status")
+    commands.add_parser("pause", help="pause auto-resume")
+    commands.add_parser("unpause", help="unpause auto-resume")
+    timeout = commands.add_parser("timeout", help="set the silence timeout")
+    timeout.add_argument("seconds", type=float)
+    commands.add_parser("resume", help="resume Spotify now")
+    commands.add_parser("reconnect", help="retry a failed Spotify sign-in")
+    commands.add_parser("watch", help="print status changes as they happen")
+    args = parser.parse_args()
+
+    try:
+        conn = Connection(args.address)
+    except OSError as e:
+        sys.exit(f"Can't reach NoSilence at {args.address}: {e}")
+
+    try:
+        if args.command == "status":
+            result = conn.call("status")
+        elif args.command in ("pause", "unpause"):
+            result = conn.call("pause", paused=args.command == "pause")
+        elif args.command == "timeout":
+            result = conn.call("set_timeout", seconds=args.seconds)
+        elif args.command == "resume":
+            result = conn.call("force_resume")
+        elif args.command == "reconnect":
+            result = conn.call("reconnect")
+        else:
+            conn.call("subscribe")
+            while True:
+                print(json.dumps(conn.receive()["params"]), flush=True)
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+    except (EOFError, KeyboardInterrupt):
+        return
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()